@@ -0,0 +1,45 @@
+"""bookings: no-overlap exclusion constraint per table
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # timestamptz + interval is STABLE; minutes-only intervals are timezone-independent,
+    # so the wrapper can safely be IMMUTABLE and used in the exclusion index.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION booking_slot(booked_at timestamptz, minutes integer)
+        RETURNS tstzrange
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT tstzrange(booked_at, booked_at + make_interval(mins => minutes), '[)') $$
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE bookings
+        ADD CONSTRAINT ex_bookings_table_slot
+        EXCLUDE USING gist (
+            table_id WITH =,
+            booking_slot(booked_at, duration_minutes + buffer_minutes) WITH &&
+        )
+        WHERE (table_id IS NOT NULL AND status NOT IN ('cancelled', 'no_show'))
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE bookings DROP CONSTRAINT ex_bookings_table_slot")
+    op.execute("DROP FUNCTION booking_slot(timestamptz, integer)")
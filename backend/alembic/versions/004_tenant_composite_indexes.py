@@ -0,0 +1,54 @@
+"""composite tenant-scoped indexes for bookings and guests
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every list query filters by restaurant_id first, then orders by booked_at / created_at;
+    # trailing id matches the keyset cursor order so pages are read straight off the index.
+    op.create_index(
+        "ix_bookings_restaurant_booked_at", "bookings", ["restaurant_id", "booked_at", "id"]
+    )
+    op.create_index(
+        "ix_bookings_restaurant_status_booked_at",
+        "bookings",
+        ["restaurant_id", "status", "booked_at"],
+    )
+    op.create_index(
+        "ix_bookings_restaurant_table_booked_at",
+        "bookings",
+        ["restaurant_id", "table_id", "booked_at"],
+    )
+    op.create_index(
+        "ix_guests_restaurant_created_at",
+        "guests",
+        ["restaurant_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    # Superseded by the composites above (restaurant_id is their leading column; status alone
+    # is too unselective to be used).
+    op.drop_index("ix_bookings_restaurant_id", table_name="bookings")
+    op.drop_index("ix_bookings_status", table_name="bookings")
+    op.drop_index("ix_guests_restaurant_id", table_name="guests")
+
+
+def downgrade() -> None:
+    op.create_index("ix_guests_restaurant_id", "guests", ["restaurant_id"], unique=False)
+    op.create_index("ix_bookings_status", "bookings", ["status"], unique=False)
+    op.create_index("ix_bookings_restaurant_id", "bookings", ["restaurant_id"], unique=False)
+    op.drop_index("ix_guests_restaurant_created_at", table_name="guests")
+    op.drop_index("ix_bookings_restaurant_table_booked_at", table_name="bookings")
+    op.drop_index("ix_bookings_restaurant_status_booked_at", table_name="bookings")
+    op.drop_index("ix_bookings_restaurant_booked_at", table_name="bookings")
@@ -0,0 +1,25 @@
+"""users: functional index on lower(email) for case-insensitive login
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX ix_users_email_lower ON users (lower(email))")
+    op.drop_index("ix_users_email", table_name="users")
+
+
+def downgrade() -> None:
+    op.create_index("ix_users_email", "users", ["email"], unique=False)
+    op.drop_index("ix_users_email_lower", table_name="users")
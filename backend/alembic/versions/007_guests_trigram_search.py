@@ -0,0 +1,49 @@
+"""guests: pg_trgm GIN indexes on name and phone for substring search, name prefix index
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # fastupdate off: no pending list for every search to scan, and compact posting trees
+    # (merged pending lists left them twice the size and ~10x slower to scan).
+    op.create_index(
+        "ix_guests_name_trgm",
+        "guests",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+        postgresql_with={"fastupdate": "off"},
+    )
+    op.create_index(
+        "ix_guests_phone_trgm",
+        "guests",
+        ["phone"],
+        postgresql_using="gin",
+        postgresql_ops={"phone": "gin_trgm_ops"},
+        postgresql_with={"fastupdate": "off"},
+    )
+    # Typeahead by the start of the name, tried before the trigram match: a per-tenant range
+    # scan already in name order (C collation: LIKE 'term%' and ORDER BY on one index).
+    op.execute(
+        "CREATE INDEX ix_guests_restaurant_name_prefix "
+        'ON guests (restaurant_id, (lower(name) COLLATE "C"))'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_guests_restaurant_name_prefix", table_name="guests")
+    op.drop_index("ix_guests_phone_trgm", table_name="guests")
+    op.drop_index("ix_guests_name_trgm", table_name="guests")
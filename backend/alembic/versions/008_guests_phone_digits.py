@@ -0,0 +1,39 @@
+"""guests: normalized phone_digits, unique per restaurant, with prefix and suffix lookup indexes
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by the API on write; existing rows by scripts/backfill_phone_digits.py (batched),
+    # which skips and reports numbers another guest already has. NULL until then, so the
+    # new column cannot hold duplicates here.
+    op.add_column("guests", sa.Column("phone_digits", sa.String(), nullable=True))
+    # One guest per number (any spelling) in a restaurant; also serves prefix lookups.
+    op.execute(
+        "CREATE UNIQUE INDEX uq_guests_restaurant_phone_digits "
+        "ON guests (restaurant_id, phone_digits text_pattern_ops)"
+    )
+    # "Last N digits" lookups: prefix match on the reversed digits.
+    op.execute(
+        "CREATE INDEX ix_guests_restaurant_phone_digits_rev "
+        "ON guests (restaurant_id, reverse(phone_digits) text_pattern_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_guests_restaurant_phone_digits_rev", table_name="guests")
+    op.drop_index("uq_guests_restaurant_phone_digits", table_name="guests")
+    op.drop_column("guests", "phone_digits")
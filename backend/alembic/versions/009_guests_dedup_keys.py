@@ -0,0 +1,38 @@
+"""guests: tenant-scoped indexes for duplicate-detection blocking keys
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicate detection groups a restaurant's guests by telegram_id and by
+    # (normalized name, birthday); partial indexes cover only rows that have the key.
+    op.create_index(
+        "ix_guests_restaurant_telegram_id",
+        "guests",
+        ["restaurant_id", "telegram_id"],
+        postgresql_where=sa.text("telegram_id IS NOT NULL"),
+    )
+    op.create_index(
+        "ix_guests_restaurant_name_birthday",
+        "guests",
+        ["restaurant_id", sa.text("lower(btrim(name))"), "birthday"],
+        postgresql_where=sa.text("name IS NOT NULL AND birthday IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_guests_restaurant_name_birthday", table_name="guests")
+    op.drop_index("ix_guests_restaurant_telegram_id", table_name="guests")
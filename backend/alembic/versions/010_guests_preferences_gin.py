@@ -0,0 +1,30 @@
+"""guests: GIN index on preferences
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Preference filters: containment (@>) and key existence (?). The default jsonb_ops
+    # opclass, since jsonb_path_ops indexes only path + value pairs and cannot serve `?`.
+    op.create_index(
+        "ix_guests_preferences",
+        "guests",
+        ["preferences"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_guests_preferences", table_name="guests")
@@ -0,0 +1,29 @@
+"""bookings: (restaurant_id, guest_id, booked_at, id) index for the guest profile
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Guest history pages (booked_at DESC, id DESC keyset) and its aggregates read one
+    # guest's bookings straight off this index. ix_bookings_guest_id stays for FK cascades.
+    op.create_index(
+        "ix_bookings_restaurant_guest_booked_at",
+        "bookings",
+        ["restaurant_id", "guest_id", "booked_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_restaurant_guest_booked_at", table_name="bookings")
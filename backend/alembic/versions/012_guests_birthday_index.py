@@ -0,0 +1,30 @@
+"""guests: expression index on birthday month/day for upcoming-birthday ranges
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # month * 100 + day ignores the year, so "next N days" is one range (two when it wraps
+    # past Dec 31); Feb 29 (229) falls between Feb 28 and Mar 1 as it should.
+    op.execute(
+        "CREATE INDEX ix_guests_restaurant_birthday_mmdd ON guests (restaurant_id, "
+        "(CAST(EXTRACT(month FROM birthday) AS INTEGER) * 100 "
+        "+ CAST(EXTRACT(day FROM birthday) AS INTEGER))) "
+        "WHERE birthday IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_guests_restaurant_birthday_mmdd", table_name="guests")
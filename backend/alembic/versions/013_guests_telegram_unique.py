@@ -0,0 +1,52 @@
+"""guests: unique (restaurant_id, telegram_id) for bot identity lookups
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(
+        sa.text(
+            "SELECT count(*) FROM (SELECT 1 FROM guests WHERE telegram_id IS NOT NULL "
+            "GROUP BY restaurant_id, telegram_id HAVING count(*) > 1) d"
+        )
+    ).scalar_one()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} telegram ids belong to several guests of one restaurant; "
+            "merge them (GET /guests/duplicates, POST /guests/:id/merge) and rerun"
+        )
+    # One guest per telegram account in a restaurant; replaces the non-unique blocking-key
+    # index from 009 and the global single-column index (every lookup is tenant-scoped).
+    op.drop_index("ix_guests_restaurant_telegram_id", table_name="guests")
+    op.drop_index("ix_guests_telegram_id", table_name="guests")
+    op.create_index(
+        "uq_guests_restaurant_telegram_id",
+        "guests",
+        ["restaurant_id", "telegram_id"],
+        unique=True,
+        postgresql_where=sa.text("telegram_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_guests_restaurant_telegram_id", table_name="guests")
+    op.create_index("ix_guests_telegram_id", "guests", ["telegram_id"], unique=False)
+    op.create_index(
+        "ix_guests_restaurant_telegram_id",
+        "guests",
+        ["restaurant_id", "telegram_id"],
+        postgresql_where=sa.text("telegram_id IS NOT NULL"),
+    )
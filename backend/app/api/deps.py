@@ -1,17 +1,20 @@
-"""FastAPI dependencies: DB session, current user."""
+"""FastAPI dependencies: DB session, current user (cached principal)."""
+import logging
 from typing import Annotated, Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.security import decode_token
-from app.models.user import User, UserRole
+from app.models.user import UserRole
+from app.services import token_versions
+from app.services.principals import Principal, principals
 
+logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
 
@@ -20,8 +23,13 @@ async def get_current_user_optional(
     credentials: Annotated[
         Optional[HTTPAuthorizationCredentials], Depends(security)
     ] = None,
-) -> Optional[User]:
-    """Return current user if valid token, else None."""
+) -> Optional[Principal]:
+    """Return current user if valid token, else None.
+
+    Tokens with role/rid/ver claims are authorized from the claims plus an O(1) Redis version
+    check (Postgres only when the user's floor is not cached). Older tokens (and any token while Redis is unavailable)
+    go through the principal cache.
+    """
     if not credentials:
         return None
     payload = decode_token(credentials.credentials)
@@ -30,16 +38,32 @@ async def get_current_user_optional(
     sub = payload.get("sub")
     if not sub:
         return None
-    result = await db.execute(select(User).where(User.id == UUID(sub)))
-    user = result.scalar_one_or_none()
+    user_id = UUID(sub)
+    if "role" in payload:
+        try:
+            current = await token_versions.is_current(db, user_id, payload.get("ver", 0))
+        except Exception:
+            logger.warning("Token version check unavailable; loading principal", exc_info=True)
+        else:
+            if not current:
+                return None
+            rid = payload.get("rid")
+            return Principal(
+                id=user_id,
+                email=None,
+                role=UserRole(payload["role"]),
+                restaurant_id=UUID(rid) if rid else None,
+                is_active=True,
+            )
+    user = await principals.get(db, user_id)
     if not user or not user.is_active:
         return None
     return user
 
 
 async def get_current_user(
-    user: Annotated[Optional[User], Depends(get_current_user_optional)],
-) -> User:
+    user: Annotated[Optional[Principal], Depends(get_current_user_optional)],
+) -> Principal:
     """Require authenticated user."""
     if user is None:
         raise HTTPException(
@@ -54,8 +78,8 @@ def require_role(*allowed: UserRole):
     """Dependency factory: require user to have one of the roles."""
 
     async def _require_role(
-        user: Annotated[User, Depends(get_current_user)],
-    ) -> User:
+        user: Annotated[Principal, Depends(get_current_user)],
+    ) -> Principal:
         if user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -67,14 +91,14 @@ def require_role(*allowed: UserRole):
 
 
 async def get_restaurant_id(
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> Optional[UUID]:
     """Current user's restaurant_id (None for super_admin)."""
     return user.restaurant_id
 
 
 async def require_restaurant(
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> UUID:
     """Require current user's restaurant_id (for tenant-scoped endpoints). Super_admin has no restaurant → 403."""
     if user.restaurant_id is None:
@@ -0,0 +1,74 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+The cursor is opaque to clients: base64url(JSON) of the sort key of the last row of the
+page. The next page is `WHERE (key..., id) > (cursor...)` (or `<` for descending order),
+which is an index range scan at any depth, unlike OFFSET. The body stays a plain list;
+the cursor of the next page is returned in the `X-Next-Cursor` header (absent on the last page).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parsers: Sequence[Callable[[str], Any]]) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(parsers):
+            raise ValueError(cursor)
+        return [parse(v) for parse, v in zip(parsers, raw)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def paginate(
+    db: AsyncSession,
+    q: Select,
+    response: Response,
+    keys: Sequence[Any],
+    parsers: Sequence[Callable[[str], Any]],
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+    descending: bool = False,
+) -> list[Any]:
+    """Order `q` by `keys` and return one page of ORM rows; sets X-Next-Cursor.
+
+    `skip` (OFFSET) is kept for backward compatibility and ignored when `cursor` is given.
+    Routers bound `limit` to >= 1; a non-positive limit yields an empty page.
+    """
+    if limit < 1:
+        return []
+    q = q.order_by(*(k.desc() for k in keys) if descending else keys)
+    if cursor:
+        key, bound = tuple_(*keys), tuple_(*decode_cursor(cursor, parsers))
+        q = q.where(key < bound if descending else key > bound)
+    elif skip:
+        q = q.offset(skip)
+    rows = list((await db.execute(q.limit(limit + 1))).scalars().all())
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, k.key) for k in keys])
+    return rows
+
+
+def parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def parse_uuid(value: str) -> UUID:
+    return UUID(value)
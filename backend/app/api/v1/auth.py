@@ -1,39 +1,75 @@
-"""Auth: login, refresh, me."""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+"""Auth: login, refresh, logout, logout everywhere, me."""
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import func, select
 
 from app.api.deps import get_current_user
+from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.security import (
     create_access_token,
-    create_refresh_token,
     decode_token,
-    get_password_hash,
-    verify_password,
+    verify_and_update_password,
 )
 from app.models.user import User
 from app.schemas.auth import LoginRequest, RefreshRequest, TokenPair, UserMe
+from app.services import rate_limit, token_versions
+from app.services.principals import Principal
+from app.services.refresh_tokens import refresh_tokens
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Annotated
+from typing import Annotated, Optional
 
+settings = get_settings()
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+async def _token_pair(user: User, family: Optional[str] = None) -> TokenPair:
+    return TokenPair(
+        access_token=create_access_token(
+            user.id, user.role.value, user.restaurant_id, user.token_version
+        ),
+        refresh_token=await refresh_tokens.issue(user.id, family),
+    )
+
+
 @router.post("/login", response_model=TokenPair)
 async def login(
     body: LoginRequest,
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> TokenPair:
-    """Login by email + password. Returns access + refresh tokens."""
+    """Login by email (case-insensitive) + password. Returns access + refresh tokens.
+
+    Throttled per client IP and per email before the lookup and bcrypt: 429 with Retry-After.
+    """
+    ip = request.client.host if request.client else "unknown"
+    wait = await rate_limit.take(
+        rate_limit.Bucket(
+            f"ratelimit:login:ip:{ip}", settings.login_ip_burst, settings.login_ip_per_minute / 60
+        ),
+        rate_limit.Bucket(
+            f"ratelimit:login:email:{body.email}",
+            settings.login_email_burst,
+            settings.login_email_per_minute / 60,
+        ),
+    )
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": rate_limit.retry_after(wait)},
+        )
+    # One lookup: super_admin (no restaurant) first, then the oldest restaurant account.
     result = await db.execute(
-        select(User).where(User.email == body.email, User.restaurant_id.is_(None))
+        select(User)
+        .where(func.lower(User.email) == body.email)
+        .order_by(User.restaurant_id.is_not(None), User.created_at)
+        .limit(1)
     )
     user = result.scalar_one_or_none()
-    if not user:
-        # Also allow first user per restaurant by email (for MVP: single global admin)
-        result = await db.execute(select(User).where(User.email == body.email))
-        user = result.scalar_one_or_none()
-    if not user or not verify_password(body.password, user.password_hash):
+    valid, new_hash = (
+        await verify_and_update_password(body.password, user.password_hash) if user else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -43,10 +79,10 @@ async def login(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is inactive",
         )
-    return TokenPair(
-        access_token=create_access_token(user.id),
-        refresh_token=create_refresh_token(user.id),
-    )
+    if new_hash:
+        # Cost factor changed since this hash was made: store the rehash (committed by get_db).
+        user.password_hash = new_hash
+    return await _token_pair(user)
 
 
 @router.post("/refresh", response_model=TokenPair)
@@ -54,43 +90,64 @@ async def refresh(
     body: RefreshRequest,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> TokenPair:
-    """Issue new access + refresh tokens from refresh token."""
-    payload = decode_token(body.refresh_token)
-    if not payload or payload.get("type") != "refresh":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token",
-        )
-    from uuid import UUID
+    """Rotate: the refresh token is single-use and replaced by a new one of the same family.
 
-    user_id = payload.get("sub")
-    if not user_id:
+    Presenting an already rotated token revokes its whole family.
+    """
+    payload = decode_token(body.refresh_token)
+    consumed = None
+    if payload and payload.get("type") == "refresh":
+        consumed = await refresh_tokens.consume(payload)
+    if consumed is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
         )
-    result = await db.execute(select(User).where(User.id == UUID(user_id)))
+    user_id, family = consumed
+    result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive",
         )
-    return TokenPair(
-        access_token=create_access_token(user.id),
-        refresh_token=create_refresh_token(user.id),
-    )
+    return await _token_pair(user, family)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(body: RefreshRequest) -> None:
+    """Revoke this session (the refresh token's family)."""
+    payload = decode_token(body.refresh_token)
+    if payload and payload.get("type") == "refresh" and payload.get("fam"):
+        await refresh_tokens.revoke_family(payload["fam"])
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    user: Annotated[Principal, Depends(get_current_user)],
+) -> None:
+    """Logout everywhere: revoke all refresh tokens and outstanding access tokens of the user."""
+    await refresh_tokens.revoke_user(user.id)
+    row = (await db.execute(select(User).where(User.id == user.id))).scalar_one()
+    row.token_version += 1
+    token_versions.record_bump(db, row.id, row.token_version)
+    await db.flush()
 
 
 @router.get("/me", response_model=UserMe)
 async def me(
-    user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> UserMe:
-    """Current authenticated user."""
+    """Current authenticated user (profile read from the database, not the token)."""
+    row = (await db.execute(select(User).where(User.id == user.id))).scalar_one_or_none()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return UserMe(
-        id=user.id,
-        email=user.email,
-        role=user.role.value,
-        restaurant_id=user.restaurant_id,
-        is_active=user.is_active,
+        id=row.id,
+        email=row.email,
+        role=row.role.value,
+        restaurant_id=row.restaurant_id,
+        is_active=row.is_active,
     )
@@ -1,21 +1,119 @@
-"""Bookings: list, create, get, update, confirm, arrived, complete, cancel."""
-from datetime import datetime
+"""Bookings: list, stream, export, availability, assignment, create, get, update, confirm, arrived, complete, cancel, batch."""
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
 from typing import Annotated, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db, require_restaurant
-from app.models.booking import Booking, BookingSource, BookingStatus
+from app.api.deps import get_current_user, get_db, require_restaurant, require_role
+from app.api.export import ExportFormat, stream_export
+from app.api.pagination import paginate, parse_datetime, parse_uuid
+from app.models.booking import OCCUPYING_STATUSES, Booking, BookingSource, BookingStatus
 from app.models.guest import Guest
 from app.models.restaurant_table import RestaurantTable
-from app.models.user import User
-from app.schemas.booking import BookingConfirm, BookingCreate, BookingRead, BookingUpdate
+from app.models.user import UserRole
+from app.schemas.booking import (
+    AssignmentApply,
+    AssignmentApplyResult,
+    AssignmentPlan,
+    AssignmentProposal,
+    BookingAction,
+    BookingBatchResult,
+    BookingBatchTransition,
+    BookingConfirm,
+    BookingCreate,
+    BookingRead,
+    BookingUpdate,
+    TableAvailability,
+)
+from app.services import booking_events
+from app.services.assignment import plan_assignment
+from app.services.availability import table_availability
+from app.services.occupancy import booking_interval
+from app.services.principals import Principal
+from app.services.visits import record_visits
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
+EXCLUSION_VIOLATION = "23P01"  # SQLSTATE of ex_bookings_table_slot
+
+
+@dataclass(frozen=True)
+class _Transition:
+    allowed_from: tuple[BookingStatus, ...]
+    to: BookingStatus
+    stamp: Optional[str]  # timestamp column set to now()
+    error: str
+
+
+# Status state machine shared by single-booking handlers and batch-transition.
+TRANSITIONS: dict[BookingAction, _Transition] = {
+    BookingAction.confirm: _Transition(
+        allowed_from=(BookingStatus.new,),
+        to=BookingStatus.confirmed,
+        stamp="confirmed_at",
+        error="Booking already confirmed or closed",
+    ),
+    BookingAction.arrived: _Transition(
+        allowed_from=(BookingStatus.new, BookingStatus.confirmed),
+        to=BookingStatus.arrived,
+        stamp="arrived_at",
+        error="Booking already arrived or closed",
+    ),
+    BookingAction.complete: _Transition(
+        allowed_from=(BookingStatus.arrived,),
+        to=BookingStatus.completed,
+        stamp="completed_at",
+        error="Guest must be arrived first",
+    ),
+    BookingAction.cancel: _Transition(
+        allowed_from=(BookingStatus.new, BookingStatus.confirmed, BookingStatus.arrived),
+        to=BookingStatus.cancelled,
+        stamp=None,
+        error="Booking cannot be cancelled",
+    ),
+    BookingAction.no_show: _Transition(
+        allowed_from=(BookingStatus.new, BookingStatus.confirmed),
+        to=BookingStatus.no_show,
+        stamp=None,
+        error="Only new or confirmed bookings can be marked no-show",
+    ),
+}
+
+
+def _check_transition(booking: Booking, action: BookingAction) -> _Transition:
+    transition = TRANSITIONS[action]
+    if booking.status not in transition.allowed_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=transition.error)
+    return transition
+
+
+def _record(db: AsyncSession, kind: str, booking: Booking) -> BookingRead:
+    """Serialize the booking for the response and queue it on the restaurant event stream."""
+    read = BookingRead.model_validate(booking)
+    booking_events.record(db, booking.restaurant_id, kind, read.model_dump(mode="json"))
+    return read
+
+
+def _record_status(
+    db: AsyncSession,
+    restaurant_id: UUID,
+    booking_id: UUID,
+    new_status: BookingStatus,
+    table_id: Optional[UUID] = None,
+) -> None:
+    """Status delta for bulk updates that do not load the rows."""
+    data = {"id": str(booking_id), "status": new_status.value}
+    if table_id is not None:
+        data["table_id"] = str(table_id)
+    booking_events.record(db, restaurant_id, booking_events.BOOKING_STATUS, data)
+
 
 async def _get_booking_or_404(
     db: AsyncSession, booking_id: UUID, restaurant_id: UUID
@@ -32,21 +130,64 @@ async def _get_booking_or_404(
     return row
 
 
+async def _flush_booking(db: AsyncSession, booking: Booking) -> None:
+    """Flush booking; map the no-overlap exclusion violation to 409 with the conflicting booking."""
+    restaurant_id, table_id, booking_id = booking.restaurant_id, booking.table_id, booking.id
+    start, end = booking_interval(booking.booked_at, booking.duration_minutes, booking.buffer_minutes)
+    try:
+        await db.flush()
+    except IntegrityError as exc:
+        if getattr(exc.orig, "sqlstate", None) != EXCLUSION_VIOLATION:
+            raise
+        await db.rollback()
+        q = (
+            select(Booking)
+            .where(
+                Booking.restaurant_id == restaurant_id,
+                Booking.table_id == table_id,
+                Booking.status.in_(OCCUPYING_STATUSES),
+                # Same expression as the exclusion constraint, so its GiST index is used.
+                func.booking_slot(
+                    Booking.booked_at, Booking.duration_minutes + Booking.buffer_minutes
+                ).op("&&")(func.tstzrange(start, end)),
+            )
+            .order_by(Booking.booked_at)
+            .limit(1)
+        )
+        if booking_id is not None:
+            q = q.where(Booking.id != booking_id)
+        conflict = (await db.execute(q)).scalar_one_or_none()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Table is already booked for this time",
+                "conflicting_booking": (
+                    BookingRead.model_validate(conflict).model_dump(mode="json") if conflict else None
+                ),
+            },
+        )
+
+
 @router.get("", response_model=list[BookingRead])
 async def list_bookings(
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
     status_filter: Optional[BookingStatus] = None,
     table_id: Optional[UUID] = None,
     guest_id: Optional[UUID] = None,
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
 ) -> list[BookingRead]:
-    """List bookings. Filter by date range, status, table, guest."""
-    q = select(Booking).where(Booking.restaurant_id == restaurant_id).order_by(Booking.booked_at)
+    """List bookings. Filter by date range, status, table, guest.
+
+    Ordered by (booked_at, id); pass X-Next-Cursor back as `cursor` for the next page.
+    """
+    q = select(Booking).where(Booking.restaurant_id == restaurant_id)
     if date_from is not None:
         q = q.where(Booking.booked_at >= date_from)
     if date_to is not None:
@@ -57,18 +198,196 @@ async def list_bookings(
         q = q.where(Booking.table_id == table_id)
     if guest_id is not None:
         q = q.where(Booking.guest_id == guest_id)
-    q = q.offset(skip).limit(limit)
-    result = await db.execute(q)
-    rows = result.scalars().all()
+    rows = await paginate(
+        db, q, response, (Booking.booked_at, Booking.id), (parse_datetime, parse_uuid),
+        cursor, skip, limit,
+    )
     return [BookingRead.model_validate(r) for r in rows]
 
 
+@router.get("/stream")
+async def stream_bookings(
+    request: Request,
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(get_current_user)],
+    last_event_id: Annotated[Optional[str], Header()] = None,
+) -> StreamingResponse:
+    """Server-sent events: booking created / updated / status changes of the current restaurant.
+
+    Reconnect with Last-Event-ID to replay what was missed (within the Redis backlog).
+    """
+
+    async def events():
+        async for item in booking_events.subscribe(restaurant_id, last_event_id):
+            if await request.is_disconnected():
+                break
+            if item is None:
+                yield ": ping\n\n"
+                continue
+            yield f"id: {item['id']}\nevent: {item['type']}\ndata: {item['data']}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export")
+async def export_bookings(
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(require_role(UserRole.owner, UserRole.admin))],
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    fmt: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.csv,
+    gzip: bool = False,
+) -> StreamingResponse:
+    """Booking history with guest and table names as CSV or NDJSON (optionally gzip), streamed."""
+    q = (
+        select(
+            Booking.id,
+            Booking.booked_at,
+            Booking.duration_minutes,
+            Booking.buffer_minutes,
+            Booking.guests_count,
+            Booking.status,
+            Booking.source,
+            Booking.table_id,
+            RestaurantTable.name.label("table_name"),
+            Booking.guest_id,
+            Guest.name.label("guest_name"),
+            Guest.phone.label("guest_phone"),
+            Booking.confirmed_at,
+            Booking.arrived_at,
+            Booking.completed_at,
+            Booking.created_at,
+        )
+        .join(Guest, Guest.id == Booking.guest_id)
+        .outerjoin(RestaurantTable, RestaurantTable.id == Booking.table_id)
+        .where(Booking.restaurant_id == restaurant_id)
+        .order_by(Booking.booked_at, Booking.id)
+    )
+    if date_from is not None:
+        q = q.where(Booking.booked_at >= date_from)
+    if date_to is not None:
+        q = q.where(Booking.booked_at <= date_to)
+    return stream_export(q, fmt, gzip, "bookings")
+
+
+@router.get("/availability", response_model=list[TableAvailability])
+async def get_availability(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(get_current_user)],
+    day: Annotated[date, Query(alias="date")],
+    guests_count: Annotated[int, Query(ge=1)] = 2,
+    duration: Annotated[int, Query(ge=5, le=24 * 60)] = 90,
+    buffer_minutes: Annotated[int, Query(ge=0, le=24 * 60)] = 15,
+    days: Annotated[int, Query(ge=1, le=7)] = 1,
+) -> list[TableAvailability]:
+    """Free start times per table that fits the party (capacity >= guests_count).
+
+    `date` is a local day in the restaurant timezone; `days` up to 7 for a week view.
+    """
+    tables = await table_availability(
+        db, restaurant_id, day, guests_count, duration, buffer_minutes, days=days
+    )
+    return [TableAvailability.model_validate(t) for t in tables]
+
+
+@router.get("/assignment", response_model=AssignmentPlan)
+async def preview_assignment(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(get_current_user)],
+    date_from: datetime,
+    date_to: datetime,
+) -> AssignmentPlan:
+    """Propose best-fit tables for unassigned new bookings in [date_from, date_to)."""
+    plan = await plan_assignment(db, restaurant_id, date_from, date_to)
+    return AssignmentPlan(
+        assignments=[
+            AssignmentProposal(
+                booking_id=r.id,
+                table_id=plan.assignments[r.id].id,
+                booked_at=r.booked_at,
+                guests_count=r.guests,
+                table_capacity=plan.assignments[r.id].capacity,
+            )
+            for r in plan.requests
+            if r.id in plan.assignments
+        ],
+        unassigned=plan.unassigned,
+        wasted_seats=plan.wasted_seats,
+    )
+
+
+@router.post("/assignment/apply", response_model=AssignmentApplyResult)
+async def apply_assignment(
+    body: AssignmentApply,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(get_current_user)],
+) -> AssignmentApplyResult:
+    """Confirm bookings with the given tables in one statement (all or nothing on overlap).
+
+    Bookings that are no longer `new` are skipped.
+    """
+    if not body.assignments:
+        return AssignmentApplyResult(confirmed=[], skipped=[])
+    table_ids = {a.table_id for a in body.assignments}
+    found = await db.execute(
+        select(RestaurantTable.id).where(
+            RestaurantTable.id.in_(table_ids),
+            RestaurantTable.restaurant_id == restaurant_id,
+        )
+    )
+    if len(found.all()) != len(table_ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Table not found")
+    plan = values(
+        column("booking_id", PGUUID(as_uuid=True)),
+        column("table_id", PGUUID(as_uuid=True)),
+        name="plan",
+    ).data([(a.booking_id, a.table_id) for a in body.assignments])
+    try:
+        result = await db.execute(
+            update(Booking)
+            .where(
+                Booking.id == plan.c.booking_id,
+                Booking.restaurant_id == restaurant_id,
+                Booking.status == BookingStatus.new,
+            )
+            .values(
+                table_id=plan.c.table_id,
+                status=BookingStatus.confirmed,
+                confirmed_at=datetime.now(timezone.utc),
+            )
+            .returning(Booking.id)
+            .execution_options(synchronize_session=False)
+        )
+    except IntegrityError as exc:
+        if getattr(exc.orig, "sqlstate", None) != EXCLUSION_VIOLATION:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Tables were taken meanwhile; refresh the assignment preview",
+        )
+    confirmed = set(result.scalars().all())
+    for a in body.assignments:
+        if a.booking_id in confirmed:
+            _record_status(db, restaurant_id, a.booking_id, BookingStatus.confirmed, a.table_id)
+    return AssignmentApplyResult(
+        confirmed=[a.booking_id for a in body.assignments if a.booking_id in confirmed],
+        skipped=[a.booking_id for a in body.assignments if a.booking_id not in confirmed],
+    )
+
+
 @router.get("/{booking_id}", response_model=BookingRead)
 async def get_booking(
     booking_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> BookingRead:
     """Get booking by id."""
     booking = await _get_booking_or_404(db, booking_id, restaurant_id)
@@ -80,7 +399,7 @@ async def create_booking(
     body: BookingCreate,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> BookingRead:
     """Create booking (manual/walk-in). Guest and table must belong to restaurant."""
     guest_result = await db.execute(
@@ -110,9 +429,8 @@ async def create_booking(
         created_by_user_id=user.id,
     )
     db.add(booking)
-    await db.flush()
-    await db.refresh(booking)
-    return BookingRead.model_validate(booking)
+    await _flush_booking(db, booking)
+    return _record(db, booking_events.BOOKING_CREATED, booking)
 
 
 @router.patch("/{booking_id}", response_model=BookingRead)
@@ -121,10 +439,19 @@ async def update_booking(
     body: BookingUpdate,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> BookingRead:
     """Update booking (time, table, etc.)."""
     booking = await _get_booking_or_404(db, booking_id, restaurant_id)
+    if body.table_id is not None and body.table_id != booking.table_id:
+        table_result = await db.execute(
+            select(RestaurantTable).where(
+                RestaurantTable.id == body.table_id,
+                RestaurantTable.restaurant_id == restaurant_id,
+            )
+        )
+        if not table_result.scalar_one_or_none():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Table not found")
     if body.table_id is not None:
         booking.table_id = body.table_id
     if body.booked_at is not None:
@@ -135,9 +462,8 @@ async def update_booking(
         booking.buffer_minutes = body.buffer_minutes
     if body.guests_count is not None:
         booking.guests_count = body.guests_count
-    await db.flush()
-    await db.refresh(booking)
-    return BookingRead.model_validate(booking)
+    await _flush_booking(db, booking)
+    return _record(db, booking_events.BOOKING_UPDATED, booking)
 
 
 @router.post("/{booking_id}/confirm", response_model=BookingRead)
@@ -146,12 +472,11 @@ async def confirm_booking(
     body: BookingConfirm,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> BookingRead:
     """Confirm booking (set table)."""
     booking = await _get_booking_or_404(db, booking_id, restaurant_id)
-    if booking.status != BookingStatus.new:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Booking already confirmed or closed")
+    _check_transition(booking, BookingAction.confirm)
     table_result = await db.execute(
         select(RestaurantTable).where(
             RestaurantTable.id == body.table_id,
@@ -160,13 +485,11 @@ async def confirm_booking(
     )
     if not table_result.scalar_one_or_none():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Table not found")
-    from datetime import timezone
     booking.table_id = body.table_id
     booking.status = BookingStatus.confirmed
     booking.confirmed_at = datetime.now(timezone.utc)
-    await db.flush()
-    await db.refresh(booking)
-    return BookingRead.model_validate(booking)
+    await _flush_booking(db, booking)
+    return _record(db, booking_events.BOOKING_STATUS, booking)
 
 
 @router.post("/{booking_id}/arrived", response_model=BookingRead)
@@ -174,18 +497,16 @@ async def booking_arrived(
     booking_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> BookingRead:
-    """Mark guest arrived (check-in)."""
+    """Mark guest arrived (check-in); counts the visit on the guest."""
     booking = await _get_booking_or_404(db, booking_id, restaurant_id)
-    if booking.status not in (BookingStatus.new, BookingStatus.confirmed):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Booking already arrived or closed")
-    from datetime import timezone
+    _check_transition(booking, BookingAction.arrived)
     booking.status = BookingStatus.arrived
     booking.arrived_at = datetime.now(timezone.utc)
     await db.flush()
-    await db.refresh(booking)
-    return BookingRead.model_validate(booking)
+    await record_visits(db, [(booking.guest_id, booking.arrived_at)])
+    return _record(db, booking_events.BOOKING_STATUS, booking)
 
 
 @router.post("/{booking_id}/complete", response_model=BookingRead)
@@ -193,18 +514,15 @@ async def booking_complete(
     booking_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> BookingRead:
     """Mark visit complete (free table)."""
     booking = await _get_booking_or_404(db, booking_id, restaurant_id)
-    if booking.status != BookingStatus.arrived:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Guest must be arrived first")
-    from datetime import timezone
+    _check_transition(booking, BookingAction.complete)
     booking.status = BookingStatus.completed
     booking.completed_at = datetime.now(timezone.utc)
     await db.flush()
-    await db.refresh(booking)
-    return BookingRead.model_validate(booking)
+    return _record(db, booking_events.BOOKING_STATUS, booking)
 
 
 @router.post("/{booking_id}/cancel", response_model=BookingRead)
@@ -212,13 +530,84 @@ async def cancel_booking(
     booking_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> BookingRead:
     """Cancel booking."""
     booking = await _get_booking_or_404(db, booking_id, restaurant_id)
-    if booking.status in (BookingStatus.completed, BookingStatus.cancelled, BookingStatus.no_show):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Booking cannot be cancelled")
+    _check_transition(booking, BookingAction.cancel)
     booking.status = BookingStatus.cancelled
     await db.flush()
-    await db.refresh(booking)
-    return BookingRead.model_validate(booking)
+    return _record(db, booking_events.BOOKING_STATUS, booking)
+
+
+@router.post("/batch-transition", response_model=list[BookingBatchResult])
+async def batch_transition(
+    body: BookingBatchTransition,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(get_current_user)],
+) -> list[BookingBatchResult]:
+    """Apply one action to many bookings in a single UPDATE ... RETURNING; result per id."""
+    transition = TRANSITIONS[body.action]
+    changes: dict = {"status": transition.to}
+    if transition.stamp:
+        changes[transition.stamp] = datetime.now(timezone.utc)
+    if body.action == BookingAction.confirm:
+        if body.table_id is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="table_id is required to confirm")
+        table_result = await db.execute(
+            select(RestaurantTable.id).where(
+                RestaurantTable.id == body.table_id,
+                RestaurantTable.restaurant_id == restaurant_id,
+            )
+        )
+        if not table_result.scalar_one_or_none():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Table not found")
+        changes["table_id"] = body.table_id
+    ids = list(dict.fromkeys(body.booking_ids))
+    try:
+        result = await db.execute(
+            update(Booking)
+            .where(
+                Booking.id.in_(ids),
+                Booking.restaurant_id == restaurant_id,
+                Booking.status.in_(transition.allowed_from),
+            )
+            .values(**changes)
+            .returning(Booking.id, Booking.guest_id)
+            .execution_options(synchronize_session=False)
+        )
+    except IntegrityError as exc:
+        if getattr(exc.orig, "sqlstate", None) != EXCLUSION_VIOLATION:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Table is already booked for some of these bookings",
+        )
+    updated = result.all()
+    done = {row.id for row in updated}
+    if body.action == BookingAction.arrived:
+        await record_visits(db, [(row.guest_id, changes["arrived_at"]) for row in updated])
+    failed = [i for i in ids if i not in done]
+    current: dict[UUID, BookingStatus] = {}
+    if failed:
+        rows = await db.execute(
+            select(Booking.id, Booking.status).where(
+                Booking.id.in_(failed), Booking.restaurant_id == restaurant_id
+            )
+        )
+        current = dict(rows.all())
+    for i in ids:
+        if i in done:
+            _record_status(db, restaurant_id, i, transition.to, changes.get("table_id"))
+    return [
+        BookingBatchResult(booking_id=i, ok=True, status=transition.to.value)
+        if i in done
+        else BookingBatchResult(
+            booking_id=i,
+            ok=False,
+            status=current[i].value if i in current else None,
+            error=transition.error if i in current else "Booking not found",
+        )
+        for i in ids
+    ]
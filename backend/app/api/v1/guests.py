@@ -1,45 +1,390 @@
-"""Guests: list, create, get, update."""
-from typing import Annotated, Optional
-from uuid import UUID
+"""Guests: list, create, get, profile, update, birthdays, bulk import, export, duplicates and merge."""
+import calendar
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Annotated, Any, Callable, Coroutine, Optional
+from uuid import UUID, uuid4
+from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import or_, select
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import any_, bindparam, func, or_, select, true, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PGUUID
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.api.deps import get_current_user, get_db, require_restaurant
+from app.api.deps import get_current_user, get_db, require_restaurant, require_role
+from app.api.export import ExportFormat, stream_export
+from app.api.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    parse_datetime,
+    parse_uuid,
+)
+from app.core.config import get_settings
+from app.models.booking import Booking, BookingStatus
 from app.models.guest import Guest
-from app.models.user import User
-from app.schemas.guest import GuestCreate, GuestRead, GuestUpdate
+from app.models.restaurant import Restaurant
+from app.models.user import UserRole
+from app.schemas.booking import BookingRead
+from app.schemas.guest import (
+    GuestBirthday,
+    GuestCreate,
+    GuestDuplicateGroup,
+    GuestImportJob,
+    GuestMerge,
+    GuestProfile,
+    GuestRead,
+    GuestStats,
+    GuestUpdate,
+)
+from app.services import guest_import
+from app.services.guest_dedup import find_duplicates, merge_guests
+from app.services.guest_identity import guest_identities
+from app.services.phones import normalize_phone, phone_digits
+from app.services.preferences import preference_filter
+from app.services.principals import Principal
+from app.services.visits import VISITED
 
+settings = get_settings()
 router = APIRouter(prefix="/guests", tags=["guests"])
 
+UNIQUE_VIOLATION = "23505"  # SQLSTATE of uq_guests_restaurant_phone(_digits)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def _phone_taken(
+    db: AsyncSession, restaurant_id: UUID, digits: str, guest_id: Optional[UUID] = None
+) -> bool:
+    q = select(Guest.id).where(Guest.restaurant_id == restaurant_id, Guest.phone_digits == digits)
+    if guest_id is not None:
+        q = q.where(Guest.id != guest_id)
+    return (await db.execute(q.limit(1))).scalar_one_or_none() is not None
+
+
+async def _flush_guest(db: AsyncSession) -> None:
+    """Flush; a concurrent write of the same number (unique violation) is a 400."""
+    try:
+        await db.flush()
+    except IntegrityError as exc:
+        if getattr(exc.orig, "sqlstate", None) != UNIQUE_VIOLATION:
+            raise
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Phone already exists")
+
+
+def _birthday_in(birthday: date, year: int) -> date:
+    """The birthday in `year`; Feb 29 is celebrated on Feb 28 in common years."""
+    try:
+        return birthday.replace(year=year)
+    except ValueError:
+        return date(year, 2, 28)
+
+
+def _next_birthday(birthday: date, start: date) -> date:
+    day = _birthday_in(birthday, start.year)
+    return day if day >= start else _birthday_in(birthday, start.year + 1)
+
 
 @router.get("", response_model=list[GuestRead])
 async def list_guests(
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
     search: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 50,
+    phone: Optional[str] = None,
+    pref: Annotated[Optional[list[str]], Query()] = None,
+    cursor: Optional[str] = None,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
 ) -> list[GuestRead]:
-    """List guests of current restaurant. Optional search by phone/name."""
-    q = select(Guest).where(Guest.restaurant_id == restaurant_id).order_by(Guest.created_at.desc())
+    """List guests of current restaurant, newest first. Optional search by phone/name.
+
+    Ordered by (created_at, id) descending; pass X-Next-Cursor back as `cursor`.
+    With `search`: names starting with the term, by name; if those do not fill the page (or
+    the term does not start with a letter), substring match on phone or name (trigram
+    indexes), best matches first. Top `limit` only; only the first
+    guest_search_max_candidates (at least `limit`) substring matches are ranked, so a broad
+    term gets good matches rather than the best ones. Terms shorter than
+    guest_search_min_length return [].
+    With `phone` (any formatting): up to phone_suffix_max_length digits match the end of the
+    number ("last 4 digits"), longer input matches its start; newest first, top `limit`.
+    `search` and `phone` return one page: `cursor` / `skip` with them are a 400.
+    `pref` (repeatable, ANDed, combines with the above): `key` = preference present (a promoted
+    boolean: is true), `key:value` = preference has that value (see app.services.preferences).
+    """
+    if (phone is not None or (search and search.strip())) and (cursor or skip):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor and skip are not supported with search or phone (top matches only)",
+        )
+    q = select(Guest).where(Guest.restaurant_id == restaurant_id)
+    if pref:
+        try:
+            q = q.where(preference_filter(pref))
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if phone is not None:
+        digits = phone_digits(phone)
+        if not digits:
+            return []
+        if len(digits) <= settings.phone_suffix_max_length:
+            q = q.where(func.reverse(Guest.phone_digits).like(digits[::-1] + "%"))
+        else:
+            # Typed with or without the country code: both prefixes are index range scans.
+            q = q.where(
+                or_(
+                    Guest.phone_digits.like(digits + "%"),
+                    Guest.phone_digits.like(settings.default_phone_country_code + digits + "%"),
+                )
+            )
+        q = q.order_by(Guest.created_at.desc(), Guest.id.desc()).limit(limit)
+        rows = (await db.execute(q)).scalars().all()
+        return [GuestRead.model_validate(r) for r in rows]
     if search and search.strip():
-        term = f"%{search.strip()}%"
-        q = q.where(or_(Guest.phone.ilike(term), Guest.name.ilike(term)))
-    q = q.offset(skip).limit(limit)
-    result = await db.execute(q)
-    rows = result.scalars().all()
+        term = search.strip()
+        if len(term) < settings.guest_search_min_length:
+            return []
+        # The start of the name (how a hostess usually types it) is a range scan of one index,
+        # already in name order; the trigram substring match, which reads every tenant's
+        # postings and ranks its candidates, only runs when the prefix does not fill the page
+        # or the term is not a name (digits, "+992 ...").
+        rows: list[Guest] = []
+        if term[0].isalpha():
+            q_prefix = (
+                q.where(Guest.name_key.like(_escape_like(term.lower()) + "%"))
+                .order_by(Guest.name_key, Guest.id)
+                .limit(limit)
+            )
+            rows = list((await db.execute(q_prefix)).scalars().all())
+        if len(rows) < limit:
+            pattern = f"%{_escape_like(term)}%"
+            # Phones are digits and punctuation: a term without digits only matches names.
+            columns = ("name", "phone") if any(ch.isdigit() for ch in term) else ("name",)
+            # Rank a bounded candidate set: a broad term ("+992", a common name) matches most
+            # of the tenant, and ranking all of it costs a full scan.
+            candidates = (
+                q.where(or_(*(getattr(Guest, c).ilike(pattern) for c in columns)))
+                .limit(max(limit, settings.guest_search_max_candidates))
+                .subquery("candidates")
+            )
+            match = aliased(Guest, candidates)
+            rank = func.greatest(*(func.word_similarity(term, getattr(match, c)) for c in columns))
+            q = (
+                select(match)
+                .order_by(rank.desc(), match.created_at.desc(), match.id.desc())
+                .limit(limit)
+            )
+            rows = list((await db.execute(q)).scalars().all())
+        return [GuestRead.model_validate(r) for r in rows]
+    rows = await paginate(
+        db, q, response, (Guest.created_at, Guest.id), (parse_datetime, parse_uuid),
+        cursor, skip, limit, descending=True,
+    )
     return [GuestRead.model_validate(r) for r in rows]
 
 
+@router.get("/export")
+async def export_guests(
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(require_role(UserRole.owner, UserRole.admin))],
+    fmt: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.csv,
+    gzip: bool = False,
+    pref: Annotated[Optional[list[str]], Query()] = None,
+) -> StreamingResponse:
+    """Whole guest base (or the `pref` segment) as CSV or NDJSON (optionally gzip), streamed (Owner/Admin)."""
+    q = (
+        select(
+            Guest.id,
+            Guest.phone,
+            Guest.phone_digits,
+            Guest.name,
+            Guest.birthday,
+            Guest.telegram_id,
+            Guest.visit_count,
+            Guest.first_visit_at,
+            Guest.last_visit_at,
+            Guest.preferences,
+            Guest.created_at,
+        )
+        .where(Guest.restaurant_id == restaurant_id)
+        .order_by(Guest.created_at.desc(), Guest.id.desc())
+    )
+    if pref:
+        try:
+            q = q.where(preference_filter(pref))
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return stream_export(q, fmt, gzip, "guests")
+
+
+@router.get("/duplicates", response_model=list[GuestDuplicateGroup])
+async def list_duplicates(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(require_role(UserRole.owner, UserRole.admin))],
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+) -> list[GuestDuplicateGroup]:
+    """Likely duplicate guests (same phone digits, telegram_id, or name + birthday), largest groups first."""
+    clusters = await find_duplicates(db, restaurant_id, limit)
+    ids = [g for c in clusters for g in c.guest_ids]
+    # One array parameter, not one per id: clusters can be large (bind parameter cap).
+    id_array = bindparam("ids", ids, type_=ARRAY(PGUUID(as_uuid=True)))
+    rows = (await db.execute(select(Guest).where(Guest.id == any_(id_array)))).scalars().all()
+    by_id = {g.id: g for g in rows}
+    return [
+        GuestDuplicateGroup(
+            reasons=sorted(c.reasons),
+            guests=[GuestRead.model_validate(by_id[g]) for g in c.guest_ids if g in by_id],
+        )
+        for c in clusters
+    ]
+
+
+@router.get("/birthdays", response_model=list[GuestBirthday])
+async def upcoming_birthdays(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(get_current_user)],
+    days: Annotated[int, Query(ge=0, le=366)] = 7,
+    start: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+) -> list[GuestBirthday]:
+    """Guests whose birthday falls in [start, start + days], soonest first; wraps past Dec 31.
+
+    `start` defaults to today in the restaurant timezone. A range on the indexed
+    month * 100 + day expression (two ranges when the window crosses the new year);
+    pass X-Next-Cursor back as `cursor`.
+    """
+    if start is None:
+        tz_name = (
+            await db.execute(select(Restaurant.timezone).where(Restaurant.id == restaurant_id))
+        ).scalar_one()
+        start = datetime.now(ZoneInfo(tz_name)).date()
+    end = start + timedelta(days=days)
+    lo = start.month * 100 + start.day
+    hi = end.month * 100 + end.day
+    if hi == 228 and not calendar.isleap(end.year):
+        hi = 229
+    mmdd = Guest.birthday_mmdd
+    q = select(Guest).where(Guest.restaurant_id == restaurant_id, Guest.birthday.is_not(None))
+    if days < 365:
+        q = q.where(mmdd.between(lo, hi) if lo <= hi else or_(mmdd >= lo, mmdd <= hi))
+    # Days-ahead order without date math: dates before `lo` belong to next year.
+    ahead = (mmdd - lo + 1300) % 1300
+    if cursor:
+        q = q.where(tuple_(ahead, Guest.id) > tuple_(*decode_cursor(cursor, (int, parse_uuid))))
+    rows = (await db.execute(q.order_by(ahead, Guest.id).limit(limit + 1))).scalars().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([(last.birthday_mmdd - lo + 1300) % 1300, last.id])
+    return [
+        GuestBirthday(
+            **GuestRead.model_validate(g).model_dump(), next_birthday=_next_birthday(g.birthday, start)
+        )
+        for g in rows
+    ]
+
+
+class _ImportUploadRoute(APIRoute):
+    """Rejects an upload whose Content-Length is over the cap before the form is parsed.
+
+    FastAPI reads (and spools) a multipart body before dependencies or the endpoint run, so
+    the check has to sit in the route handler. Chunked uploads without Content-Length are
+    still capped while the endpoint copies the file.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def check_length(request: Request) -> Response:
+            length = request.headers.get("content-length", "")
+            if length.isdigit() and int(length) > settings.guest_import_max_bytes + _FORM_OVERHEAD:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="File is too large",
+                )
+            return await handler(request)
+
+        return check_length
+
+
+_FORM_OVERHEAD = 64 * 1024  # multipart boundaries and part headers around the file
+
+
+async def import_guests(
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(get_current_user)],
+    file: Annotated[UploadFile, File()],
+) -> GuestImportJob:
+    """Start a bulk import from CSV or XLSX (header row with phone, optional name / birthday).
+
+    Rows are merged by phone (existing guests are updated, others inserted). Returns a job;
+    poll GET /guests/import/{job_id} for progress and per-row errors.
+    """
+    filename = file.filename or "upload"
+    kind = "xlsx" if filename.lower().endswith(".xlsx") else "csv"
+    fd, path = tempfile.mkstemp(prefix="guest-import-", suffix=f".{kind}")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(1024 * 1024):
+                size += len(chunk)
+                if size > settings.guest_import_max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="File is too large",
+                    )
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    job_id = uuid4().hex
+    await guest_import.create_job(job_id, restaurant_id, filename)
+    guest_import.start_import(job_id, restaurant_id, path, kind)
+    return GuestImportJob(job_id=job_id, filename=filename, status="queued")
+
+
+router.add_api_route(
+    "/import",
+    import_guests,
+    methods=["POST"],
+    response_model=GuestImportJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    route_class_override=_ImportUploadRoute,
+)
+
+
+@router.get("/import/{job_id}", response_model=GuestImportJob)
+async def get_import_job(
+    job_id: str,
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(get_current_user)],
+) -> GuestImportJob:
+    """Import progress: counters, status and the first guest_import_max_errors row errors."""
+    job = await guest_import.get_job(job_id, restaurant_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+    return GuestImportJob(job_id=job_id, **job)
+
+
 @router.get("/{guest_id}", response_model=GuestRead)
 async def get_guest(
     guest_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> GuestRead:
     """Get guest by id."""
     result = await db.execute(
@@ -51,29 +396,114 @@ async def get_guest(
     return GuestRead.model_validate(row)
 
 
+@router.get("/{guest_id}/profile", response_model=GuestProfile)
+async def get_guest_profile(
+    guest_id: UUID,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(get_current_user)],
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 20,
+) -> GuestProfile:
+    """Guest card: the guest, visit stats and a page of bookings (newest first) in one statement.
+
+    Stats: per-table aggregates of the guest's bookings, summed with window functions
+    (favourite table = first_value by visits); bookings page by X-Next-Cursor.
+    """
+    own = (Booking.restaurant_id == restaurant_id, Booking.guest_id == guest_id)
+    visited = VISITED
+    per_table = (
+        select(
+            Booking.table_id,
+            func.count().label("bookings"),
+            func.count().filter(visited).label("visits"),
+            func.count().filter(Booking.status == BookingStatus.no_show).label("no_shows"),
+            func.count().filter(Booking.status == BookingStatus.cancelled).label("cancellations"),
+            func.coalesce(func.sum(Booking.guests_count).filter(visited), 0).label("party"),
+            func.max(Booking.booked_at).label("last_at"),
+        )
+        .where(*own)
+        .group_by(Booking.table_id)
+        .subquery("per_table")
+    )
+    visits = func.sum(per_table.c.visits).over()
+    stats = (
+        select(
+            func.sum(per_table.c.bookings).over().label("bookings"),
+            visits.label("visits"),
+            func.sum(per_table.c.no_shows).over().label("no_shows"),
+            func.sum(per_table.c.cancellations).over().label("cancellations"),
+            func.round(func.sum(per_table.c.party).over() / func.nullif(visits, 0), 1).label(
+                "avg_party_size"
+            ),
+            func.first_value(per_table.c.table_id)
+            .over(
+                order_by=(
+                    per_table.c.table_id.is_(None),
+                    per_table.c.visits.desc(),
+                    per_table.c.last_at.desc(),
+                )
+            )
+            .label("favourite_table_id"),
+        )
+        .limit(1)
+        .subquery("stats")
+    )
+    page_q = select(Booking).where(*own)
+    if cursor:
+        bound = tuple_(*decode_cursor(cursor, (parse_datetime, parse_uuid)))
+        page_q = page_q.where(tuple_(Booking.booked_at, Booking.id) < bound)
+    page = page_q.order_by(Booking.booked_at.desc(), Booking.id.desc()).limit(limit + 1).subquery("page")
+    page_booking = aliased(Booking, page)
+    rows = (
+        await db.execute(
+            select(Guest, stats, page_booking)
+            .select_from(Guest)
+            .outerjoin(stats, true())
+            .outerjoin(page_booking, true())
+            .where(Guest.id == guest_id, Guest.restaurant_id == restaurant_id)
+            .order_by(page.c.booked_at.desc(), page.c.id.desc())
+        )
+    ).all()
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Guest not found")
+    first = rows[0]
+    bookings = [r[-1] for r in rows if r[-1] is not None]
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([bookings[-1].booked_at, bookings[-1].id])
+    stat_values = {k: getattr(first, k) for k in GuestStats.model_fields}
+    return GuestProfile(
+        guest=GuestRead.model_validate(first[0]),
+        stats=GuestStats(**{k: v for k, v in stat_values.items() if v is not None}),
+        bookings=[BookingRead.model_validate(b) for b in bookings],
+    )
+
+
 @router.post("", response_model=GuestRead, status_code=status.HTTP_201_CREATED)
 async def create_guest(
     body: GuestCreate,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> GuestRead:
-    """Create guest (manual entry). Phone must be unique per restaurant."""
-    existing = await db.execute(
-        select(Guest).where(Guest.restaurant_id == restaurant_id, Guest.phone == body.phone)
-    )
-    if existing.scalar_one_or_none():
+    """Create guest (manual entry). Phone (normalized to E.164 digits) must be unique per restaurant."""
+    digits = normalize_phone(body.phone)
+    if not digits:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid phone")
+    if await _phone_taken(db, restaurant_id, digits):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Phone already exists")
     guest = Guest(
         restaurant_id=restaurant_id,
         phone=body.phone,
+        phone_digits=digits,
         name=body.name,
         birthday=body.birthday,
         preferences=body.preferences,
     )
     db.add(guest)
-    await db.flush()
-    await db.refresh(guest)
+    await _flush_guest(db)
     return GuestRead.model_validate(guest)
 
 
@@ -83,9 +513,9 @@ async def update_guest(
     body: GuestUpdate,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> GuestRead:
-    """Update guest."""
+    """Update guest. A new phone must not be another guest's number (any spelling)."""
     result = await db.execute(
         select(Guest).where(Guest.id == guest_id, Guest.restaurant_id == restaurant_id)
     )
@@ -93,13 +523,37 @@ async def update_guest(
     if not guest:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Guest not found")
     if body.phone is not None:
+        digits = normalize_phone(body.phone)
+        if not digits:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid phone")
+        if await _phone_taken(db, restaurant_id, digits, guest.id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Phone already exists")
         guest.phone = body.phone
+        guest.phone_digits = digits
     if body.name is not None:
         guest.name = body.name
     if body.birthday is not None:
         guest.birthday = body.birthday
     if body.preferences is not None:
         guest.preferences = body.preferences
-    await db.flush()
-    await db.refresh(guest)
+    await _flush_guest(db)
+    guest_identities.invalidate_after_commit(db, restaurant_id, [guest.telegram_id])
+    return GuestRead.model_validate(guest)
+
+
+@router.post("/{guest_id}/merge", response_model=GuestRead)
+async def merge_guest(
+    guest_id: UUID,
+    body: GuestMerge,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(require_role(UserRole.owner, UserRole.admin))],
+) -> GuestRead:
+    """Merge `source_ids` into this guest: bookings move over, counters and preferences combine, sources are deleted."""
+    try:
+        guest = await merge_guests(db, restaurant_id, guest_id, body.source_ids)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
     return GuestRead.model_validate(guest)
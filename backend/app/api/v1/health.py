@@ -1,10 +1,18 @@
 """Health check."""
 from fastapi import APIRouter
 
+from app.services.guest_identity import guest_identities
+from app.services.principals import principals
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 async def health() -> dict:
     """Liveness/readiness probe."""
-    return {"status": "ok", "service": "guestflow-api"}
+    return {
+        "status": "ok",
+        "service": "guestflow-api",
+        "principal_cache": principals.stats(),
+        "guest_identity_cache": guest_identities.stats(),
+    }
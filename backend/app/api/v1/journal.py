@@ -0,0 +1,65 @@
+"""Day journal: tables + that day's bookings with guest summaries, for the hostess calendar."""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Annotated
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+
+from app.api.deps import get_current_user, get_db, require_restaurant
+from app.models.booking import Booking
+from app.models.restaurant import Restaurant
+from app.models.restaurant_table import RestaurantTable
+from app.schemas.journal import DayJournal, JournalBooking
+from app.schemas.table import TableRead
+from app.services.principals import Principal
+
+router = APIRouter(prefix="/journal", tags=["journal"])
+
+
+@router.get("", response_model=DayJournal)
+async def get_journal(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    restaurant_id: Annotated[UUID, Depends(require_restaurant)],
+    user: Annotated[Principal, Depends(get_current_user)],
+    day: Annotated[date, Query(alias="date")],
+) -> DayJournal:
+    """Tables and bookings of one local day (restaurant timezone) with guest name/phone/visits.
+
+    Two statements: restaurant timezone + tables, then bookings joined with guests.
+    """
+    rows = (
+        await db.execute(
+            select(Restaurant.timezone, RestaurantTable)
+            .select_from(Restaurant)
+            .outerjoin(RestaurantTable, RestaurantTable.restaurant_id == Restaurant.id)
+            .where(Restaurant.id == restaurant_id)
+            .order_by(RestaurantTable.sort_order, RestaurantTable.name)
+        )
+    ).all()
+    tz_name = rows[0].timezone
+    tables = [TableRead.model_validate(t) for _, t in rows if t is not None]
+
+    tz = ZoneInfo(tz_name)
+    day_start = datetime.combine(day, time.min, tzinfo=tz).astimezone(timezone.utc)
+    day_end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz).astimezone(timezone.utc)
+    result = await db.execute(
+        select(Booking)
+        .join(Booking.guest)
+        .options(contains_eager(Booking.guest))
+        .where(
+            Booking.restaurant_id == restaurant_id,
+            Booking.booked_at >= day_start,
+            Booking.booked_at < day_end,
+        )
+        .order_by(Booking.booked_at, Booking.id)
+    )
+    return DayJournal(
+        date=day,
+        timezone=tz_name,
+        tables=tables,
+        bookings=[JournalBooking.model_validate(b) for b in result.scalars().all()],
+    )
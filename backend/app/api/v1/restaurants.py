@@ -45,5 +45,4 @@ async def update_current_restaurant(
     if body.contacts is not None:
         restaurant.contacts = body.contacts
     await db.flush()
-    await db.refresh(restaurant)
     return RestaurantRead.model_validate(restaurant)
@@ -8,8 +8,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db, require_restaurant
 from app.models.restaurant_table import RestaurantTable
-from app.models.user import User
 from app.schemas.table import TableCreate, TableRead, TableUpdate
+from app.services.principals import Principal
 
 router = APIRouter(prefix="/tables", tags=["tables"])
 
@@ -18,7 +18,7 @@ router = APIRouter(prefix="/tables", tags=["tables"])
 async def list_tables(
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> list[TableRead]:
     """List tables of current restaurant."""
     result = await db.execute(
@@ -35,7 +35,7 @@ async def get_table(
     table_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> TableRead:
     """Get table by id."""
     result = await db.execute(
@@ -55,7 +55,7 @@ async def create_table(
     body: TableCreate,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> TableRead:
     """Create table."""
     table = RestaurantTable(
@@ -66,7 +66,6 @@ async def create_table(
     )
     db.add(table)
     await db.flush()
-    await db.refresh(table)
     return TableRead.model_validate(table)
 
 
@@ -76,7 +75,7 @@ async def update_table(
     body: TableUpdate,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> TableRead:
     """Update table."""
     result = await db.execute(
@@ -95,7 +94,6 @@ async def update_table(
     if body.sort_order is not None:
         table.sort_order = body.sort_order
     await db.flush()
-    await db.refresh(table)
     return TableRead.model_validate(table)
 
 
@@ -104,7 +102,7 @@ async def delete_table(
     table_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ) -> None:
     """Delete table."""
     result = await db.execute(
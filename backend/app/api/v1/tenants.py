@@ -2,30 +2,40 @@
 from typing import Annotated, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db, require_role
+from app.api.pagination import paginate, parse_uuid
 from app.models.restaurant import Restaurant
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.schemas.restaurant import RestaurantCreate, RestaurantList, RestaurantRead, RestaurantUpdate
+from app.services.principals import Principal
 
 router = APIRouter(prefix="/tenants", tags=["tenants"])
 
 
 @router.get("", response_model=list[RestaurantList])
 async def list_tenants(
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
-    user: Annotated[User, Depends(require_role(UserRole.super_admin))],
-    skip: int = 0,
-    limit: int = 50,
+    user: Annotated[Principal, Depends(require_role(UserRole.super_admin))],
+    cursor: Optional[str] = None,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
 ) -> list[RestaurantList]:
-    """List all restaurants (Super Admin only)."""
-    result = await db.execute(
-        select(Restaurant).order_by(Restaurant.name).offset(skip).limit(limit)
+    """List all restaurants (Super Admin only), by (name, id); cursor via X-Next-Cursor."""
+    rows = await paginate(
+        db,
+        select(Restaurant),
+        response,
+        (Restaurant.name, Restaurant.id),
+        (str, parse_uuid),
+        cursor,
+        skip,
+        limit,
     )
-    rows = result.scalars().all()
     return [RestaurantList.model_validate(r) for r in rows]
 
 
@@ -33,7 +43,7 @@ async def list_tenants(
 async def get_tenant(
     tenant_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
-    user: Annotated[User, Depends(require_role(UserRole.super_admin))],
+    user: Annotated[Principal, Depends(require_role(UserRole.super_admin))],
 ) -> RestaurantRead:
     """Get restaurant by id (Super Admin only)."""
     result = await db.execute(select(Restaurant).where(Restaurant.id == tenant_id))
@@ -47,7 +57,7 @@ async def get_tenant(
 async def create_tenant(
     body: RestaurantCreate,
     db: Annotated[AsyncSession, Depends(get_db)],
-    user: Annotated[User, Depends(require_role(UserRole.super_admin))],
+    user: Annotated[Principal, Depends(require_role(UserRole.super_admin))],
 ) -> RestaurantRead:
     """Create restaurant (Super Admin only)."""
     restaurant = Restaurant(
@@ -57,7 +67,6 @@ async def create_tenant(
     )
     db.add(restaurant)
     await db.flush()
-    await db.refresh(restaurant)
     return RestaurantRead.model_validate(restaurant)
 
 
@@ -66,7 +75,7 @@ async def update_tenant(
     tenant_id: UUID,
     body: RestaurantUpdate,
     db: Annotated[AsyncSession, Depends(get_db)],
-    user: Annotated[User, Depends(require_role(UserRole.super_admin))],
+    user: Annotated[Principal, Depends(require_role(UserRole.super_admin))],
 ) -> RestaurantRead:
     """Update restaurant (Super Admin only)."""
     result = await db.execute(select(Restaurant).where(Restaurant.id == tenant_id))
@@ -80,5 +89,4 @@ async def update_tenant(
     if body.contacts is not None:
         restaurant.contacts = body.contacts
     await db.flush()
-    await db.refresh(restaurant)
     return RestaurantRead.model_validate(restaurant)
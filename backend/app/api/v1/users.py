@@ -1,36 +1,43 @@
 """Users (staff): list, create, get, update."""
-from typing import Annotated
+from typing import Annotated, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db, require_restaurant, require_role
-from app.core.security import get_password_hash
+from app.api.pagination import paginate, parse_uuid
+from app.core.security import hash_password
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserRead, UserUpdate
+from app.services import token_versions
+from app.services.principals import Principal, principals
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("", response_model=list[UserRead])
 async def list_users(
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(require_role(UserRole.owner, UserRole.admin))],
-    skip: int = 0,
-    limit: int = 50,
+    user: Annotated[Principal, Depends(require_role(UserRole.owner, UserRole.admin))],
+    cursor: Optional[str] = None,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
 ) -> list[UserRead]:
-    """List users of current restaurant (Owner/Admin)."""
-    result = await db.execute(
-        select(User)
-        .where(User.restaurant_id == restaurant_id)
-        .order_by(User.email)
-        .offset(skip)
-        .limit(limit)
+    """List users of current restaurant (Owner/Admin), by (email, id); cursor via X-Next-Cursor."""
+    rows = await paginate(
+        db,
+        select(User).where(User.restaurant_id == restaurant_id),
+        response,
+        (User.email, User.id),
+        (str, parse_uuid),
+        cursor,
+        skip,
+        limit,
     )
-    rows = result.scalars().all()
     return [UserRead.model_validate(r) for r in rows]
 
 
@@ -39,7 +46,7 @@ async def get_user(
     user_id: UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    user: Annotated[User, Depends(require_role(UserRole.owner, UserRole.admin))],
+    user: Annotated[Principal, Depends(require_role(UserRole.owner, UserRole.admin))],
 ) -> UserRead:
     """Get user by id (same restaurant)."""
     result = await db.execute(
@@ -56,7 +63,7 @@ async def create_user(
     body: UserCreate,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    current_user: Annotated[User, Depends(require_role(UserRole.owner, UserRole.admin))],
+    current_user: Annotated[Principal, Depends(require_role(UserRole.owner, UserRole.admin))],
 ) -> UserRead:
     """Create user for current restaurant (Owner/Admin)."""
     if body.role == UserRole.super_admin:
@@ -71,14 +78,13 @@ async def create_user(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
     new_user = User(
         email=body.email,
-        password_hash=get_password_hash(body.password),
+        password_hash=await hash_password(body.password),
         role=body.role,
         restaurant_id=restaurant_id,
         is_active=True,
     )
     db.add(new_user)
     await db.flush()
-    await db.refresh(new_user)
     return UserRead.model_validate(new_user)
 
 
@@ -88,7 +94,7 @@ async def update_user(
     body: UserUpdate,
     db: Annotated[AsyncSession, Depends(get_db)],
     restaurant_id: Annotated[UUID, Depends(require_restaurant)],
-    current_user: Annotated[User, Depends(require_role(UserRole.owner, UserRole.admin))],
+    current_user: Annotated[Principal, Depends(require_role(UserRole.owner, UserRole.admin))],
 ) -> UserRead:
     """Update user (Owner/Admin)."""
     result = await db.execute(
@@ -99,10 +105,17 @@ async def update_user(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     if body.email is not None:
         row.email = body.email
+    revoke = (body.role is not None and body.role != row.role) or (
+        body.is_active is not None and body.is_active != row.is_active
+    )
     if body.role is not None:
         row.role = body.role
     if body.is_active is not None:
         row.is_active = body.is_active
+    if revoke:
+        # Outstanding access tokens carry the old role / active state: reject them.
+        row.token_version += 1
+        token_versions.record_bump(db, row.id, row.token_version)
     await db.flush()
-    await db.refresh(row)
+    principals.invalidate_after_commit(db, row.id)
     return UserRead.model_validate(row)
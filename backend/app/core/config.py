@@ -33,9 +33,61 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
 
+    # Password hashing: bcrypt cost (changing it rehashes on next login) and thread pool size
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+
+    # Login throttling (token buckets checked before any password hashing)
+    login_ip_burst: int = 20
+    login_ip_per_minute: float = 10.0
+    login_email_burst: int = 5
+    login_email_per_minute: float = 1.0
+
     # CORS (comma-separated origins; фронт может быть на 3000 или 3001)
     cors_origins: str = "http://localhost:3000,http://localhost:3001"
 
+    # Table assignment solver: local-improvement time budget per request
+    assignment_time_budget_ms: int = 200
+
+    # Authenticated principal cache (per-worker LRU + optional shared Redis tier)
+    principal_cache_ttl_seconds: float = 30.0
+    principal_cache_max_entries: int = 10_000
+    principal_cache_redis: bool = False
+    principal_cache_redis_ttl_seconds: int = 300
+
+    # Bot identity cache: (restaurant_id, telegram_id) -> guest, per-worker LRU + Redis;
+    # unknown telegram ids are cached for the (short) negative TTL
+    guest_identity_cache_ttl_seconds: float = 15.0
+    guest_identity_cache_max_entries: int = 50_000
+    guest_identity_cache_redis_ttl_seconds: int = 3600
+    guest_identity_cache_negative_ttl_seconds: int = 30
+
+    # Guest typeahead: shorter terms return nothing (trigram indexes need >= 3 characters)
+    guest_search_min_length: int = 3
+    # ... and at most this many substring matches (or `limit`, if larger) are ranked: broad
+    # terms match most of the tenant
+    guest_search_max_candidates: int = 100
+
+    # Phone normalization: numbers of local length get the default country code (Tajikistan)
+    default_phone_country_code: str = "992"
+    local_phone_length: int = 9
+    # Phone lookup: at most this many digits is a "last digits" (suffix) search
+    phone_suffix_max_length: int = 4
+
+    # Guest import (CSV / XLSX): rows per COPY + merge transaction, upload cap, error report cap
+    guest_import_chunk_size: int = 5000
+    guest_import_max_bytes: int = 100 * 1024 * 1024
+    guest_import_max_errors: int = 1000
+    # A queued / running import without progress for this long is reported as failed
+    guest_import_stale_seconds: int = 600
+
+    # Streaming export: rows fetched per server-side cursor round trip
+    export_batch_size: int = 2000
+
+    # Booking event stream: Redis Stream backlog per restaurant (for Last-Event-ID resume)
+    booking_events_backlog: int = 1000
+    booking_stream_heartbeat_seconds: float = 15.0
+
     # Default timezone for new restaurants (IANA, e.g. Asia/Dushanbe for Dushanbe)
     default_timezone: str = "Asia/Dushanbe"
 
@@ -0,0 +1,60 @@
+"""Promoted guest preference keys: fixed types and normalization.
+
+Free-form keys are kept as given. Promoted keys have a fixed type and are normalized on write
+(lower-case, trimmed, lists sorted and de-duplicated), so filters on them match regardless of
+how the hostess typed them. Used by the guest schemas (validation) and by
+app.services.preferences (filters, backfill).
+"""
+from typing import Any, Optional, get_args, get_origin
+
+from pydantic import TypeAdapter, ValidationError
+
+PROMOTED: dict[str, Any] = {
+    "vegetarian": bool,
+    "vegan": bool,
+    "seating": str,  # window | terrace | bar | quiet ...
+    "allergies": list[str],
+}
+_adapters = {key: TypeAdapter(tp) for key, tp in PROMOTED.items()}
+# Type of one filter value: the element type for list keys ("allergies:nuts").
+_value_adapters = {
+    key: TypeAdapter(get_args(tp)[0] if get_origin(tp) is list else tp)
+    for key, tp in PROMOTED.items()
+}
+
+
+def _clean(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, list):
+        return sorted({_clean(v) for v in value if str(v).strip()})
+    return value
+
+
+def normalize_preferences(prefs: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+    """Validate promoted keys against their type and normalize them; ValueError if invalid."""
+    if prefs is None:
+        return None
+    out = dict(prefs)
+    for key, adapter in _adapters.items():
+        if out.get(key) is None:
+            out.pop(key, None)
+            continue
+        try:
+            out[key] = _clean(adapter.validate_python(out[key]))
+        except ValidationError:
+            raise ValueError(f"Invalid preference {key!r}")
+    return out
+
+
+def is_list(key: str) -> bool:
+    return get_origin(PROMOTED[key]) is list
+
+
+def normalize_value(key: str, raw: str) -> Any:
+    """Typed, normalized value of promoted `key` given as text (one element for list keys);
+    ValueError if invalid."""
+    try:
+        return _clean(_value_adapters[key].validate_python(raw.strip()))
+    except ValidationError:
+        raise ValueError(f"Invalid preference {key!r}")
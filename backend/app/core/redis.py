@@ -0,0 +1,22 @@
+"""Shared async Redis client (one connection pool per worker)."""
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.core.config import get_settings
+
+_client: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    global _client
+    if _client is None:
+        _client = Redis.from_url(get_settings().redis_url, decode_responses=True)
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,4 +1,11 @@
-"""Password hashing and JWT tokens."""
+"""Password hashing and JWT tokens.
+
+bcrypt is deliberately slow (~100-300 ms per call), so async handlers hash and verify through
+a bounded thread pool (`password_hash_workers`) instead of blocking the event loop; bcrypt
+releases the GIL, so threads run in parallel. The sync functions remain for scripts.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union
 from uuid import UUID
@@ -9,7 +16,31 @@ from passlib.context import CryptContext
 from app.core.config import get_settings
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min = max = default rounds: hashes with any other cost are flagged for rehash on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+_hash_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers, thread_name_prefix="bcrypt"
+        )
+    return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False)
+        _hash_pool = None
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -20,15 +51,52 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_access_token(subject: Union[str, UUID]) -> str:
+async def hash_password(password: str) -> str:
+    """get_password_hash off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_pool(), pwd_context.hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """Verify off the event loop; also returns a new hash if the stored one uses another cost."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _pool(), pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+def create_access_token(
+    subject: Union[str, UUID],
+    role: str,
+    restaurant_id: Optional[UUID],
+    token_version: int = 0,
+) -> str:
+    """Self-contained access token: role, restaurant (`rid`) and token version (`ver`) claims."""
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode = {"sub": str(subject), "exp": expire, "type": "access"}
+    to_encode = {
+        "sub": str(subject),
+        "exp": expire,
+        "type": "access",
+        "role": role,
+        "rid": str(restaurant_id) if restaurant_id else None,
+        "ver": token_version,
+    }
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
-def create_refresh_token(subject: Union[str, UUID]) -> str:
+def create_refresh_token(
+    subject: Union[str, UUID], jti: str, family: str, generation: int = 0
+) -> str:
+    """Refresh token; `jti` / `fam` / `gen` are tracked by app.services.refresh_tokens."""
     expire = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
-    to_encode = {"sub": str(subject), "exp": expire, "type": "refresh"}
+    to_encode = {
+        "sub": str(subject),
+        "exp": expire,
+        "type": "refresh",
+        "jti": jti,
+        "fam": family,
+        "gen": generation,
+    }
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
@@ -4,18 +4,21 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1 import auth, bookings, guests, health, restaurants, tables, tenants, users
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.v1 import auth, bookings, guests, health, journal, restaurants, tables, tenants, users
 from app.core.config import get_settings
+from app.core.redis import close_redis
+from app.core.security import shutdown_hash_pool
 
 settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: e.g. init Redis pool
     yield
     # Shutdown: close pools
-    pass
+    await close_redis()
+    shutdown_hash_pool()
 
 
 app = FastAPI(
@@ -32,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(health.router, prefix=settings.api_v1_prefix)
@@ -42,6 +46,7 @@ app.include_router(users.router, prefix=settings.api_v1_prefix)
 app.include_router(guests.router, prefix=settings.api_v1_prefix)
 app.include_router(tables.router, prefix=settings.api_v1_prefix)
 app.include_router(bookings.router, prefix=settings.api_v1_prefix)
+app.include_router(journal.router, prefix=settings.api_v1_prefix)
 
 
 @app.get("/")
@@ -14,7 +14,13 @@ class Base(DeclarativeBase):
 
 
 class TimestampMixin:
-    """created_at, updated_at in UTC."""
+    """created_at, updated_at in UTC.
+
+    eager_defaults: server-generated values come back via INSERT/UPDATE ... RETURNING
+    during flush, so handlers need no refresh() SELECT after writing.
+    """
+
+    __mapper_args__ = {"eager_defaults": True}
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -1,10 +1,12 @@
 """Booking model — журнал броней."""
 import enum
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import Enum as SQLEnum, ForeignKey
+from sqlalchemy import DDL, DateTime, Enum as SQLEnum, ForeignKey, Index, event, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, UUIDMixin
@@ -19,19 +21,37 @@ class BookingStatus(str, enum.Enum):
     no_show = "no_show"
 
 
+# Statuses that hold a table for booked_at + duration + buffer (cancelled / no_show free it).
+OCCUPYING_STATUSES = (
+    BookingStatus.new,
+    BookingStatus.confirmed,
+    BookingStatus.arrived,
+    BookingStatus.completed,
+)
+
+
 class BookingSource(str, enum.Enum):
     bot = "bot"
     manual = "manual"
     walk_in = "walk_in"
 
 
+# IMMUTABLE wrapper so the slot range can be used in an index (timestamptz + interval is only
+# STABLE in general, but a minutes-only interval does not depend on the session timezone).
+BOOKING_SLOT_FUNCTION = """
+CREATE OR REPLACE FUNCTION booking_slot(booked_at timestamptz, minutes integer)
+RETURNS tstzrange
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT tstzrange(booked_at, booked_at + make_interval(mins => minutes), '[)') $$
+"""
+
+
 class Booking(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "bookings"
 
     restaurant_id: Mapped[UUID] = mapped_column(
         ForeignKey("restaurants.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     guest_id: Mapped[UUID] = mapped_column(
         ForeignKey("guests.id", ondelete="CASCADE"),
@@ -43,7 +63,7 @@ class Booking(Base, UUIDMixin, TimestampMixin):
         nullable=True,
         index=True,
     )
-    booked_at: Mapped[datetime] = mapped_column(nullable=False, index=True)
+    booked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
     duration_minutes: Mapped[int] = mapped_column(nullable=False, default=90)
     buffer_minutes: Mapped[int] = mapped_column(nullable=False, default=15)
     guests_count: Mapped[int] = mapped_column(nullable=False, default=2)
@@ -51,22 +71,52 @@ class Booking(Base, UUIDMixin, TimestampMixin):
         SQLEnum(BookingStatus, name="bookingstatus", create_type=False),
         nullable=False,
         default=BookingStatus.new,
-        index=True,
     )
     source: Mapped[BookingSource] = mapped_column(
         SQLEnum(BookingSource, name="bookingsource", create_type=False),
         nullable=False,
         default=BookingSource.manual,
     )
-    confirmed_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
-    arrived_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
-    completed_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    confirmed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    arrived_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     created_by_user_id: Mapped[Optional[UUID]] = mapped_column(
         ForeignKey("users.id", ondelete="SET NULL"),
         nullable=True,
         index=True,
     )
 
+    __table_args__ = (
+        # Tenant-scoped lists: restaurant_id first, then the sort / filter columns.
+        Index("ix_bookings_restaurant_booked_at", "restaurant_id", "booked_at", "id"),
+        Index("ix_bookings_restaurant_status_booked_at", "restaurant_id", "status", "booked_at"),
+        Index("ix_bookings_restaurant_table_booked_at", "restaurant_id", "table_id", "booked_at"),
+        # Guest profile: one guest's bookings, newest first, and their stats.
+        Index(
+            "ix_bookings_restaurant_guest_booked_at", "restaurant_id", "guest_id", "booked_at", "id"
+        ),
+        # One table cannot hold two overlapping slots (cancelled / no_show do not count).
+        ExcludeConstraint(
+            ("table_id", "="),
+            (text("booking_slot(booked_at, duration_minutes + buffer_minutes)"), "&&"),
+            name="ex_bookings_table_slot",
+            using="gist",
+            where=text("table_id IS NOT NULL AND status NOT IN ('cancelled', 'no_show')"),
+        ),
+    )
+
+    @hybrid_property
+    def occupied_until(self) -> datetime:
+        """End of the table slot: booked_at + duration + buffer."""
+        return self.booked_at + timedelta(minutes=self.duration_minutes + self.buffer_minutes)
+
+    @occupied_until.inplace.expression
+    @classmethod
+    def _occupied_until_expression(cls):
+        return cls.booked_at + func.make_interval(
+            0, 0, 0, 0, 0, cls.duration_minutes + cls.buffer_minutes
+        )
+
     restaurant: Mapped["Restaurant"] = relationship(
         "Restaurant", backref="bookings", foreign_keys=[restaurant_id]
     )
@@ -79,3 +129,15 @@ class Booking(Base, UUIDMixin, TimestampMixin):
     created_by_user: Mapped[Optional["User"]] = relationship(
         "User", backref="bookings_created", foreign_keys=[created_by_user_id]
     )
+
+
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL(BOOKING_SLOT_FUNCTION).execute_if(dialect="postgresql"),
+)
@@ -3,8 +3,21 @@ from datetime import date, datetime
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    DDL,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    UniqueConstraint,
+    cast,
+    event,
+    extract,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, UUIDMixin
@@ -16,19 +29,123 @@ class Guest(Base, UUIDMixin, TimestampMixin):
     restaurant_id: Mapped[UUID] = mapped_column(
         ForeignKey("restaurants.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     phone: Mapped[str] = mapped_column(nullable=False, index=True)
+    # E.164 digits without '+' (app.services.phones.normalize_phone); lookup key for phones.
+    phone_digits: Mapped[Optional[str]] = mapped_column(nullable=True)
     name: Mapped[Optional[str]] = mapped_column(nullable=True)
     birthday: Mapped[Optional[date]] = mapped_column(nullable=True)
     preferences: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True, default=dict)
-    telegram_id: Mapped[Optional[int]] = mapped_column(nullable=True, index=True)
+    telegram_id: Mapped[Optional[int]] = mapped_column(nullable=True)
     visit_count: Mapped[int] = mapped_column(nullable=False, default=0)
-    first_visit_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
-    last_visit_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    first_visit_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_visit_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     __table_args__ = (
         UniqueConstraint("restaurant_id", "phone", name="uq_guests_restaurant_phone"),
+        # Newest-first list per restaurant, in keyset cursor order.
+        Index(
+            "ix_guests_restaurant_created_at",
+            "restaurant_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        # One guest per number (any spelling) per restaurant; phone prefix and "last digits"
+        # (reversed prefix) lookups.
+        Index(
+            "uq_guests_restaurant_phone_digits",
+            "restaurant_id",
+            "phone_digits",
+            unique=True,
+            postgresql_ops={"phone_digits": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_guests_restaurant_phone_digits_rev",
+            "restaurant_id",
+            text("reverse(phone_digits) text_pattern_ops"),
+        ),
+        # One guest per telegram account per restaurant; bot identity lookups.
+        Index(
+            "uq_guests_restaurant_telegram_id",
+            "restaurant_id",
+            "telegram_id",
+            unique=True,
+            postgresql_where=text("telegram_id IS NOT NULL"),
+        ),
+        # Duplicate-detection blocking key (app.services.guest_dedup).
+        Index(
+            "ix_guests_restaurant_name_birthday",
+            "restaurant_id",
+            text("lower(btrim(name))"),
+            "birthday",
+            postgresql_where=text("name IS NOT NULL AND birthday IS NOT NULL"),
+        ),
+        # Upcoming birthdays: month * 100 + day ranges (see birthday_mmdd).
+        Index(
+            "ix_guests_restaurant_birthday_mmdd",
+            "restaurant_id",
+            text(
+                "(CAST(EXTRACT(month FROM birthday) AS INTEGER) * 100"
+                " + CAST(EXTRACT(day FROM birthday) AS INTEGER))"
+            ),
+            postgresql_where=text("birthday IS NOT NULL"),
+        ),
+        # Substring / fuzzy search (ILIKE '%term%', word_similarity) on name and phone;
+        # fastupdate off keeps searches off the pending list (see migration 007).
+        Index(
+            "ix_guests_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_with={"fastupdate": "off"},
+        ),
+        Index(
+            "ix_guests_phone_trgm",
+            "phone",
+            postgresql_using="gin",
+            postgresql_ops={"phone": "gin_trgm_ops"},
+            postgresql_with={"fastupdate": "off"},
+        ),
+        # Search by the start of the name (lower(name) LIKE 'term%', in name order), per
+        # restaurant; see name_key.
+        Index(
+            "ix_guests_restaurant_name_prefix",
+            "restaurant_id",
+            text('(lower(name) COLLATE "C")'),
+        ),
+        # Preference filters (app.services.preferences): @> containment and ? key existence.
+        Index("ix_guests_preferences", "preferences", postgresql_using="gin"),
     )
 
+    @hybrid_property
+    def birthday_mmdd(self) -> Optional[int]:
+        """Birthday as month * 100 + day (0101..1231), ignoring the year."""
+        return self.birthday.month * 100 + self.birthday.day if self.birthday else None
+
+    @birthday_mmdd.inplace.expression
+    @classmethod
+    def _birthday_mmdd_expression(cls):
+        # Must match the ix_guests_restaurant_birthday_mmdd expression.
+        return cast(extract("month", cls.birthday), Integer) * 100 + cast(
+            extract("day", cls.birthday), Integer
+        )
+
+    @hybrid_property
+    def name_key(self) -> Optional[str]:
+        """Lower-cased name, as name prefix search matches and orders it."""
+        return self.name.lower() if self.name else None
+
+    @name_key.inplace.expression
+    @classmethod
+    def _name_key_expression(cls):
+        # Must match the ix_guests_restaurant_name_prefix expression.
+        return func.lower(cls.name).collate("C")
+
     restaurant: Mapped["Restaurant"] = relationship("Restaurant", backref="guests", foreign_keys=[restaurant_id])
+
+
+event.listen(
+    Guest.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -3,7 +3,7 @@ import enum
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import Enum, ForeignKey, UniqueConstraint
+from sqlalchemy import Enum, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, UUIDMixin
@@ -19,7 +19,7 @@ class UserRole(str, enum.Enum):
 class User(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "users"
 
-    email: Mapped[str] = mapped_column(unique=False, nullable=False, index=True)
+    email: Mapped[str] = mapped_column(unique=False, nullable=False)
     password_hash: Mapped[str] = mapped_column(nullable=False)
     role: Mapped[UserRole] = mapped_column(
         Enum(UserRole),
@@ -32,9 +32,13 @@ class User(Base, UUIDMixin, TimestampMixin):
         index=True,
     )
     is_active: Mapped[bool] = mapped_column(nullable=False, default=True)
+    # Bumped on role change / deactivation; access tokens with an older `ver` are rejected.
+    token_version: Mapped[int] = mapped_column(nullable=False, default=0)
 
     __table_args__ = (
         UniqueConstraint("restaurant_id", "email", name="uq_users_restaurant_email"),
+        # Case-insensitive login lookup.
+        Index("ix_users_email_lower", text("lower(email)")),
     )
 
     restaurant: Mapped[Optional["Restaurant"]] = relationship(
@@ -1,9 +1,10 @@
 """Booking schemas."""
+import enum
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.models.booking import BookingSource, BookingStatus
 
@@ -54,3 +55,66 @@ class BookingRead(BaseModel):
 
 class BookingConfirm(BaseModel):
     table_id: UUID
+
+
+class BookingAction(str, enum.Enum):
+    confirm = "confirm"
+    arrived = "arrived"
+    complete = "complete"
+    cancel = "cancel"
+    no_show = "no_show"
+
+
+class BookingBatchTransition(BaseModel):
+    booking_ids: list[UUID] = Field(min_length=1, max_length=500)
+    action: BookingAction
+    table_id: Optional[UUID] = None  # required for confirm
+
+
+class BookingBatchResult(BaseModel):
+    booking_id: UUID
+    ok: bool
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class AvailabilityRange(BaseModel):
+    """Any start from `start` to `end` (inclusive, 5-minute step) is free."""
+
+    start: datetime
+    end: datetime
+
+
+class TableAvailability(BaseModel):
+    table_id: UUID
+    name: str
+    capacity: Optional[int] = None
+    free_starts: list[AvailabilityRange]
+
+
+class AssignmentProposal(BaseModel):
+    booking_id: UUID
+    table_id: UUID
+    booked_at: datetime
+    guests_count: int
+    table_capacity: int
+
+
+class AssignmentPlan(BaseModel):
+    assignments: list[AssignmentProposal]
+    unassigned: list[UUID]
+    wasted_seats: int
+
+
+class AssignmentItem(BaseModel):
+    booking_id: UUID
+    table_id: UUID
+
+
+class AssignmentApply(BaseModel):
+    assignments: list[AssignmentItem]
+
+
+class AssignmentApplyResult(BaseModel):
+    confirmed: list[UUID]
+    skipped: list[UUID]
@@ -3,7 +3,10 @@ from datetime import date, datetime
 from typing import Any, Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.preferences import normalize_preferences
+from app.schemas.booking import BookingRead
 
 
 class GuestBase(BaseModel):
@@ -14,7 +17,10 @@ class GuestBase(BaseModel):
 
 
 class GuestCreate(GuestBase):
-    pass
+    @field_validator("preferences")
+    @classmethod
+    def promoted_preferences(cls, v: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        return normalize_preferences(v)
 
 
 class GuestUpdate(BaseModel):
@@ -23,6 +29,11 @@ class GuestUpdate(BaseModel):
     birthday: Optional[date] = None
     preferences: Optional[dict[str, Any]] = None
 
+    @field_validator("preferences")
+    @classmethod
+    def promoted_preferences(cls, v: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        return normalize_preferences(v)
+
 
 class GuestRead(GuestBase):
     id: UUID
@@ -36,3 +47,48 @@ class GuestRead(GuestBase):
 
     class Config:
         from_attributes = True
+
+
+class GuestBirthday(GuestRead):
+    next_birthday: date
+
+
+class GuestStats(BaseModel):
+    bookings: int = 0
+    visits: int = 0  # arrived + completed
+    no_shows: int = 0
+    cancellations: int = 0
+    avg_party_size: Optional[float] = None  # over visits
+    favourite_table_id: Optional[UUID] = None  # most visited
+
+
+class GuestProfile(BaseModel):
+    guest: GuestRead
+    stats: GuestStats
+    bookings: list[BookingRead]  # newest first, one page
+
+
+class GuestDuplicateGroup(BaseModel):
+    reasons: list[str]  # phone | telegram_id | name_birthday
+    guests: list[GuestRead]  # oldest first
+
+
+class GuestMerge(BaseModel):
+    source_ids: list[UUID] = Field(min_length=1, max_length=50)
+
+
+class GuestImportError(BaseModel):
+    row: int
+    error: str
+
+
+class GuestImportJob(BaseModel):
+    job_id: str
+    filename: str
+    status: str  # queued | running | done | failed
+    processed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    detail: Optional[str] = None
+    errors: list[GuestImportError] = []
@@ -0,0 +1,30 @@
+"""Day journal schemas (hostess calendar)."""
+from datetime import date
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.schemas.booking import BookingRead
+from app.schemas.table import TableRead
+
+
+class JournalGuest(BaseModel):
+    id: UUID
+    name: Optional[str] = None
+    phone: str
+    visit_count: int = 0
+
+    class Config:
+        from_attributes = True
+
+
+class JournalBooking(BookingRead):
+    guest: JournalGuest
+
+
+class DayJournal(BaseModel):
+    date: date
+    timezone: str
+    tables: list[TableRead]
+    bookings: list[JournalBooking]
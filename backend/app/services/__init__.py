@@ -0,0 +1 @@
+# Services: domain engines shared by API routers
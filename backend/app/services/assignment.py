@@ -0,0 +1,196 @@
+"""Best-fit table assignment for unassigned `new` bookings of a service period.
+
+Objective (lexicographic): seat as many bookings as possible, then minimise wasted seats
+(table capacity - guests_count). Greedy best-fit by decreasing party size, then local
+improvement within a time budget:
+  * ejection — seat an unassigned booking by moving the single booking blocking a table
+    to another free table;
+  * relocation — move a booking to a smaller free table that still fits.
+Bookings that already hold a table (confirmed, arrived, new with a table) are fixed.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.booking import OCCUPYING_STATUSES, Booking, BookingStatus
+from app.models.restaurant_table import RestaurantTable
+from app.services.occupancy import TableSlots, as_utc, booking_interval
+
+settings = get_settings()
+
+
+@dataclass
+class SeatRequest:
+    id: UUID
+    start: datetime
+    end: datetime
+    guests: int
+    booked_at: datetime
+
+
+@dataclass
+class TableSeat:
+    id: UUID
+    capacity: int
+    sort_order: int
+    slots: TableSlots = field(default_factory=lambda: TableSlots(since=datetime.min))
+
+
+@dataclass
+class AssignmentResult:
+    requests: list[SeatRequest]
+    assignments: dict[UUID, TableSeat]
+    unassigned: list[UUID]
+
+    @property
+    def wasted_seats(self) -> int:
+        return sum(
+            self.assignments[r.id].capacity - r.guests
+            for r in self.requests
+            if r.id in self.assignments
+        )
+
+
+def solve(
+    requests: list[SeatRequest], tables: list[TableSeat], time_budget_ms: int
+) -> AssignmentResult:
+    """Assign requests to tables; `tables[*].slots` must already hold fixed bookings."""
+    deadline = time.monotonic() + time_budget_ms / 1000
+    tables = sorted(tables, key=lambda t: (t.capacity, t.sort_order))
+    by_id = {r.id: r for r in requests}
+    # Fitting tables per request, tightest first.
+    fits = {r.id: [t for t in tables if t.capacity >= r.guests] for r in requests}
+    assigned: dict[UUID, TableSeat] = {}
+
+    def place(r: SeatRequest, t: TableSeat) -> None:
+        t.slots.add(r.start, r.end, r.id)
+        assigned[r.id] = t
+
+    def unplace(r: SeatRequest) -> TableSeat:
+        t = assigned.pop(r.id)
+        t.slots.remove(r.start, r.end, r.id)
+        return t
+
+    def free_table(r: SeatRequest, exclude: Optional[TableSeat] = None) -> Optional[TableSeat]:
+        for t in fits[r.id]:
+            if t is not exclude and t.slots.find_conflict(r.start, r.end) is None:
+                return t
+        return None
+
+    for r in sorted(requests, key=lambda r: (-r.guests, r.start)):
+        t = free_table(r)
+        if t is not None:
+            place(r, t)
+
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        for r in requests:
+            if r.id in assigned or time.monotonic() >= deadline:
+                continue
+            for t in fits[r.id]:
+                blockers = t.slots.overlapping(r.start, r.end)
+                if len(blockers) != 1 or blockers[0] not in assigned:
+                    continue
+                blocker = by_id[blockers[0]]
+                unplace(blocker)
+                alt = free_table(blocker, exclude=t)
+                if alt is None:
+                    place(blocker, t)
+                    continue
+                place(blocker, alt)
+                place(r, t)
+                improved = True
+                break
+        for rid, t in list(assigned.items()):
+            if time.monotonic() >= deadline:
+                break
+            r = by_id[rid]
+            for smaller in fits[rid]:
+                if smaller.capacity >= t.capacity:
+                    break
+                if smaller.slots.find_conflict(r.start, r.end) is None:
+                    unplace(r)
+                    place(r, smaller)
+                    improved = True
+                    break
+
+    return AssignmentResult(
+        requests=requests,
+        assignments=assigned,
+        unassigned=[r.id for r in requests if r.id not in assigned],
+    )
+
+
+async def plan_assignment(
+    db: AsyncSession, restaurant_id: UUID, date_from: datetime, date_to: datetime
+) -> AssignmentResult:
+    """Load unassigned `new` bookings with booked_at in [date_from, date_to) and solve."""
+    date_from, date_to = as_utc(date_from), as_utc(date_to)
+    pending = (
+        await db.execute(
+            select(
+                Booking.id,
+                Booking.booked_at,
+                Booking.duration_minutes,
+                Booking.buffer_minutes,
+                Booking.guests_count,
+            )
+            .where(
+                Booking.restaurant_id == restaurant_id,
+                Booking.status == BookingStatus.new,
+                Booking.table_id.is_(None),
+                Booking.booked_at >= date_from,
+                Booking.booked_at < date_to,
+            )
+            .order_by(Booking.booked_at)
+        )
+    ).all()
+    requests = []
+    for b in pending:
+        start, end = booking_interval(b.booked_at, b.duration_minutes, b.buffer_minutes)
+        requests.append(SeatRequest(b.id, start, end, b.guests_count, b.booked_at))
+    if not requests:
+        return AssignmentResult(requests=[], assignments={}, unassigned=[])
+
+    window_start = min(r.start for r in requests)
+    window_end = max(r.end for r in requests)
+    table_rows = (
+        await db.execute(
+            select(RestaurantTable.id, RestaurantTable.capacity, RestaurantTable.sort_order).where(
+                RestaurantTable.restaurant_id == restaurant_id,
+                RestaurantTable.capacity.is_not(None),
+            )
+        )
+    ).all()
+    tables = {t.id: TableSeat(t.id, t.capacity, t.sort_order) for t in table_rows}
+    fixed = (
+        await db.execute(
+            select(
+                Booking.id,
+                Booking.table_id,
+                Booking.booked_at,
+                Booking.duration_minutes,
+                Booking.buffer_minutes,
+            )
+            .where(
+                Booking.restaurant_id == restaurant_id,
+                Booking.table_id.is_not(None),
+                Booking.status.in_(OCCUPYING_STATUSES),
+                Booking.booked_at < window_end,
+                Booking.occupied_until > window_start,
+            )
+            .order_by(Booking.booked_at)
+        )
+    ).all()
+    for b in fixed:
+        if b.table_id in tables:
+            start, end = booking_interval(b.booked_at, b.duration_minutes, b.buffer_minutes)
+            tables[b.table_id].slots.intervals.append((start, end, b.id))
+    return solve(requests, list(tables.values()), settings.assignment_time_budget_ms)
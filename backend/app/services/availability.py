@@ -0,0 +1,135 @@
+"""Free-slot availability on a NumPy slot grid (rows = tables, columns = 5-minute slots).
+
+Occupied slots are painted with a difference array + cumsum; a start is free when the
+prefix-sum of busy slots over the next `duration + buffer` is zero. One pass over the
+bookings, no per-slot queries.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.booking import OCCUPYING_STATUSES, Booking
+from app.models.restaurant import Restaurant
+from app.models.restaurant_table import RestaurantTable
+
+SLOT_MINUTES = 5
+
+
+def _slot_index(moments: np.ndarray, origin: datetime, ceil: bool) -> np.ndarray:
+    """Seconds-since-origin array → slot indices (floor for starts, ceil for ends)."""
+    seconds = moments - origin.timestamp()
+    step = SLOT_MINUTES * 60
+    return (np.ceil(seconds / step) if ceil else np.floor(seconds / step)).astype(np.int64)
+
+
+def free_start_ranges(
+    n_tables: int,
+    origin: datetime,
+    n_starts: int,
+    need_slots: int,
+    rows: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    first_start: int = 0,
+) -> list[list[tuple[int, int]]]:
+    """Per table, inclusive ranges of free start slot indices.
+
+    rows/starts/ends: table row and UTC timestamps (seconds) of each occupied interval.
+    """
+    width = n_starts + need_slots
+    diff = np.zeros((n_tables, width + 1), dtype=np.int32)
+    if len(rows):
+        s = np.clip(_slot_index(starts, origin, ceil=False), 0, width)
+        e = np.clip(_slot_index(ends, origin, ceil=True), 0, width)
+        np.add.at(diff, (rows, s), 1)
+        np.add.at(diff, (rows, e), -1)
+    busy = np.cumsum(diff, axis=1)[:, :width] > 0
+    prefix = np.zeros((n_tables, width + 1), dtype=np.int32)
+    np.cumsum(busy, axis=1, out=prefix[:, 1:])
+    free = (prefix[:, need_slots : need_slots + n_starts] - prefix[:, :n_starts]) == 0
+    free[:, : max(0, min(first_start, n_starts))] = False
+
+    edges = np.diff(np.pad(free.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    begin_rows, begin_cols = np.nonzero(edges == 1)
+    _, end_cols = np.nonzero(edges == -1)
+    ranges: list[list[tuple[int, int]]] = [[] for _ in range(n_tables)]
+    for r, b, e in zip(begin_rows.tolist(), begin_cols.tolist(), end_cols.tolist()):
+        ranges[r].append((b, e - 1))
+    return ranges
+
+
+async def table_availability(
+    db: AsyncSession,
+    restaurant_id: UUID,
+    day: date,
+    guests_count: int,
+    duration_minutes: int,
+    buffer_minutes: int,
+    days: int = 1,
+    now: Optional[datetime] = None,
+) -> list[dict]:
+    """Free start ranges per table with capacity >= guests_count for `days` local days."""
+    tz_name = (
+        await db.execute(select(Restaurant.timezone).where(Restaurant.id == restaurant_id))
+    ).scalar_one()
+    tz = ZoneInfo(tz_name)
+    origin = datetime.combine(day, time.min, tzinfo=tz).astimezone(timezone.utc)
+    window_end = datetime.combine(day + timedelta(days=days), time.min, tzinfo=tz).astimezone(
+        timezone.utc
+    )
+    n_starts = int((window_end - origin).total_seconds()) // (SLOT_MINUTES * 60)
+    need_slots = -(-(duration_minutes + buffer_minutes) // SLOT_MINUTES)
+    grid_end = origin + timedelta(minutes=SLOT_MINUTES * (n_starts + need_slots))
+
+    tables = (
+        await db.execute(
+            select(RestaurantTable.id, RestaurantTable.name, RestaurantTable.capacity)
+            .where(
+                RestaurantTable.restaurant_id == restaurant_id,
+                RestaurantTable.capacity >= guests_count,
+            )
+            .order_by(RestaurantTable.capacity, RestaurantTable.sort_order, RestaurantTable.name)
+        )
+    ).all()
+    if not tables:
+        return []
+    row_of = {t.id: i for i, t in enumerate(tables)}
+
+    occupied = (
+        await db.execute(
+            select(Booking.table_id, Booking.booked_at, Booking.occupied_until).where(
+                Booking.restaurant_id == restaurant_id,
+                Booking.table_id.in_(row_of.keys()),
+                Booking.status.in_(OCCUPYING_STATUSES),
+                Booking.booked_at < grid_end,
+                Booking.occupied_until > origin,
+            )
+        )
+    ).all()
+    rows = np.fromiter((row_of[b.table_id] for b in occupied), dtype=np.int64, count=len(occupied))
+    starts = np.fromiter((b.booked_at.timestamp() for b in occupied), dtype=np.float64, count=len(occupied))
+    ends = np.fromiter((b.occupied_until.timestamp() for b in occupied), dtype=np.float64, count=len(occupied))
+
+    now = now or datetime.now(timezone.utc)
+    first_start = -(-int((now - origin).total_seconds()) // (SLOT_MINUTES * 60))
+    ranges = free_start_ranges(
+        len(tables), origin, n_starts, need_slots, rows, starts, ends, first_start
+    )
+
+    def at(slot: int) -> datetime:
+        return (origin + timedelta(minutes=SLOT_MINUTES * slot)).astimezone(tz)
+
+    return [
+        {
+            "table_id": t.id,
+            "name": t.name,
+            "capacity": t.capacity,
+            "free_starts": [{"start": at(b), "end": at(e)} for b, e in ranges[i]],
+        }
+        for i, t in enumerate(tables)
+    ]
@@ -0,0 +1,126 @@
+"""Booking change feed per restaurant, fanned out through Redis.
+
+Each event is appended to a capped Redis Stream (`bookings:events:{restaurant_id}`), which
+assigns its id and keeps a short backlog for Last-Event-ID resume, and then published on the
+`bookings:{restaurant_id}` pub/sub channel so that every worker's subscribers get it live.
+
+Handlers only `record()` events on the session; they are published after the transaction
+commits (nothing is sent for rolled-back writes, and a client that re-reads on an event
+always sees the row).
+"""
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Optional
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.redis import get_redis
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+BOOKING_CREATED = "booking.created"
+BOOKING_UPDATED = "booking.updated"
+BOOKING_STATUS = "booking.status"
+
+_PENDING_KEY = "booking_events"
+_tasks: set[asyncio.Task] = set()  # strong refs until publishing finishes
+
+Event = tuple[UUID, str, dict[str, Any]]  # (restaurant_id, type, data)
+
+
+def stream_key(restaurant_id: UUID) -> str:
+    return f"bookings:events:{restaurant_id}"
+
+
+def channel(restaurant_id: UUID) -> str:
+    return f"bookings:{restaurant_id}"
+
+
+def record(db: AsyncSession, restaurant_id: UUID, kind: str, data: dict[str, Any]) -> None:
+    """Queue an event on the session; it is published once the transaction commits."""
+    db.sync_session.info.setdefault(_PENDING_KEY, []).append((restaurant_id, kind, data))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        task = asyncio.get_running_loop().create_task(publish(events))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+async def publish(events: list[Event]) -> None:
+    """Append to the restaurant stream (assigns the id) and fan out on pub/sub."""
+    redis = get_redis()
+    try:
+        for restaurant_id, kind, data in events:
+            payload = json.dumps(data, default=str)
+            event_id = await redis.xadd(
+                stream_key(restaurant_id),
+                {"type": kind, "data": payload},
+                maxlen=settings.booking_events_backlog,
+                approximate=True,
+            )
+            await redis.publish(
+                channel(restaurant_id), json.dumps({"id": event_id, "type": kind, "data": payload})
+            )
+    except Exception:
+        logger.warning("Publishing booking events failed", exc_info=True)
+
+
+def _stream_id(value: str) -> tuple[int, int]:
+    ms, _, seq = value.partition("-")
+    return int(ms), int(seq or 0)
+
+
+async def subscribe(
+    restaurant_id: UUID, last_event_id: Optional[str] = None
+) -> AsyncIterator[Optional[dict[str, str]]]:
+    """Yield events {id, type, data} for a restaurant; None on idle (heartbeat).
+
+    With `last_event_id`, events after it still in the backlog are replayed first. The channel
+    is subscribed before the replay read, so nothing falls in between; duplicates are skipped.
+    """
+    redis = get_redis()
+    pubsub = redis.pubsub()
+    await pubsub.subscribe(channel(restaurant_id))
+    try:
+        last: Optional[tuple[int, int]] = None
+        if last_event_id:
+            try:
+                last = _stream_id(last_event_id)
+            except ValueError:
+                last = None
+            if last is not None:
+                backlog = await redis.xrange(stream_key(restaurant_id), min=f"({last_event_id}", max="+")
+                for event_id, fields in backlog:
+                    last = _stream_id(event_id)
+                    yield {"id": event_id, "type": fields["type"], "data": fields["data"]}
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=settings.booking_stream_heartbeat_seconds
+            )
+            if message is None:
+                yield None
+                continue
+            item = json.loads(message["data"])
+            event_id = _stream_id(item["id"])
+            if last is not None and event_id <= last:
+                continue
+            last = event_id
+            yield item
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
@@ -0,0 +1,186 @@
+"""Duplicate guest detection and merge within one restaurant.
+
+Detection uses blocking keys instead of pairwise comparison: guests sharing a key are
+candidates. Each key is one GROUP BY over the tenant's rows (O(n)), and the groups from all
+keys are joined into clusters with union-find, so a guest matched by phone to one row and by
+telegram_id to another ends up in a single cluster.
+
+Keys: the raw phone normalized in SQL (phones.normalized_phone_sql), telegram_id, and
+(lower(btrim(name)), birthday). The phone key does not use phone_digits: that is unique per
+restaurant, and the guests it would group are exactly the ones the backfill left without it
+("+992 90 123 45 67" next to an existing "901234567").
+
+Merging keeps a target guest, re-points the sources' bookings to it with one UPDATE,
+combines counters and preferences, and deletes the sources — all in the caller's transaction.
+"""
+import heapq
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.booking import Booking
+from app.models.guest import Guest
+from app.services.guest_identity import guest_identities
+from app.services.phones import normalized_phone_sql
+
+_normalized_name = func.lower(func.btrim(Guest.name))
+_normalized_phone = normalized_phone_sql(Guest.phone)
+
+BLOCKING_KEYS = {
+    "phone": ((_normalized_phone,), (_normalized_phone != "",)),
+    "telegram_id": ((Guest.telegram_id,), (Guest.telegram_id.is_not(None),)),
+    "name_birthday": (
+        (_normalized_name, Guest.birthday),
+        (Guest.name.is_not(None), Guest.birthday.is_not(None)),
+    ),
+}
+
+
+@dataclass
+class DuplicateCluster:
+    guest_ids: list[UUID]
+    reasons: set[str] = field(default_factory=set)
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: dict[UUID, UUID] = {}
+
+    def find(self, x: UUID) -> UUID:
+        parent = self.parent.setdefault(x, x)
+        while parent != x:
+            grand = self.parent[parent]
+            self.parent[x] = grand
+            x, parent = parent, grand
+        return x
+
+    def union(self, a: UUID, b: UUID) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+async def find_duplicates(
+    db: AsyncSession, restaurant_id: UUID, limit: Optional[int] = None
+) -> list[DuplicateCluster]:
+    """The `limit` (None = all) largest clusters of likely-duplicate guests, largest first, ties
+    by oldest member; guest ids oldest first.
+
+    Each key's groups come back as arrays ordered by (created_at, id), with the matching
+    created_at array, so no second query over every grouped id is needed. Only the returned
+    clusters are materialized.
+    """
+    uf = _UnionFind()
+    created: dict[UUID, tuple[datetime, UUID]] = {}  # sort key of every grouped guest
+    group_reasons: list[tuple[UUID, str]] = []
+    oldest_first = (Guest.created_at, Guest.id)
+    for reason, (key, present) in BLOCKING_KEYS.items():
+        q = (
+            select(
+                func.array_agg(aggregate_order_by(Guest.id, *oldest_first)),
+                func.array_agg(aggregate_order_by(Guest.created_at, *oldest_first)),
+            )
+            .where(Guest.restaurant_id == restaurant_id, *present)
+            .group_by(*key)
+            .having(func.count() > 1)
+        )
+        for ids, created_at in await db.execute(q):
+            for guest_id, at in zip(ids, created_at):
+                created[guest_id] = (at, guest_id)
+                uf.union(ids[0], guest_id)
+            group_reasons.append((ids[0], reason))
+
+    sizes: Counter[UUID] = Counter()
+    oldest: dict[UUID, tuple[datetime, UUID]] = {}
+    for guest_id, sort_key in created.items():
+        root = uf.find(guest_id)
+        sizes[root] += 1
+        oldest[root] = min(oldest.get(root, sort_key), sort_key)
+
+    def rank(root: UUID) -> tuple:
+        return -sizes[root], oldest[root]
+
+    roots = heapq.nsmallest(limit, sizes, key=rank) if limit is not None else sorted(sizes, key=rank)
+    clusters = {root: DuplicateCluster(guest_ids=[]) for root in roots}
+    for guest_id in created:
+        cluster = clusters.get(uf.find(guest_id))
+        if cluster is not None:
+            cluster.guest_ids.append(guest_id)
+    for guest_id, reason in group_reasons:
+        cluster = clusters.get(uf.find(guest_id))
+        if cluster is not None:
+            cluster.reasons.add(reason)
+    for cluster in clusters.values():
+        cluster.guest_ids.sort(key=created.__getitem__)
+    return list(clusters.values())
+
+
+async def merge_guests(
+    db: AsyncSession, restaurant_id: UUID, target_id: UUID, source_ids: Sequence[UUID]
+) -> Guest:
+    """Merge `source_ids` into `target_id`; returns the updated target.
+
+    Rows are locked in id order (no deadlock between concurrent merges); visit counters are
+    summed, first/last visit combined, preferences merged (older sources first, the target
+    wins on conflicting keys) and missing name/birthday/telegram_id taken from the sources.
+    Raises LookupError if a guest is not in the restaurant, ValueError on an empty or
+    self-referencing merge.
+    """
+    source_ids = list(dict.fromkeys(source_ids))
+    if not source_ids:
+        raise ValueError("No guests to merge")
+    if target_id in source_ids:
+        raise ValueError("Cannot merge a guest into itself")
+    rows = (
+        await db.execute(
+            select(Guest)
+            .where(Guest.id.in_([target_id, *source_ids]), Guest.restaurant_id == restaurant_id)
+            .order_by(Guest.id)
+            .with_for_update()
+        )
+    ).scalars().all()
+    by_id = {g.id: g for g in rows}
+    if len(by_id) != len(source_ids) + 1:
+        raise LookupError("Guest not found")
+    target = by_id[target_id]
+    sources = sorted((by_id[i] for i in source_ids), key=lambda g: (g.updated_at, g.id))
+
+    await db.execute(
+        update(Booking)
+        .where(Booking.guest_id.in_(source_ids), Booking.restaurant_id == restaurant_id)
+        .values(guest_id=target_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    # Sources go first: the target may take over their telegram_id (unique per restaurant).
+    for guest in sources:
+        db.expunge(guest)
+    await db.execute(
+        delete(Guest)
+        .where(Guest.id.in_(source_ids))
+        .execution_options(synchronize_session=False)
+    )
+    guest_identities.invalidate_after_commit(
+        db, restaurant_id, [target.telegram_id, *(g.telegram_id for g in sources)]
+    )
+
+    merged = [target, *sources]
+    target.visit_count = sum(g.visit_count for g in merged)
+    target.first_visit_at = min((g.first_visit_at for g in merged if g.first_visit_at), default=None)
+    target.last_visit_at = max((g.last_visit_at for g in merged if g.last_visit_at), default=None)
+    for guest in reversed(sources):  # most recently updated first
+        target.name = target.name or guest.name
+        target.birthday = target.birthday or guest.birthday
+        target.telegram_id = target.telegram_id or guest.telegram_id
+    preferences: dict = {}
+    for guest in [*sources, target]:
+        preferences.update(guest.preferences or {})
+    target.preferences = preferences
+    await db.flush()
+    return target
@@ -0,0 +1,197 @@
+"""Bot identity cache — resolves (restaurant_id, telegram_id) to a guest without Postgres.
+
+Every bot update needs the sender's guest. Two tiers: a per-worker TTL + LRU dict and Redis
+shared by all workers (`guest:tg:{restaurant_id}:{telegram_id}`). Unknown telegram ids are
+cached too (as "not a guest"), for `guest_identity_cache_negative_ttl_seconds`, so a stranger
+spamming the bot does not hit the database either.
+
+Writes that change a guest's identity (update, merge, import) call `invalidate_after_commit`;
+the Redis keys are dropped once the transaction commits (dropping them earlier would let a
+concurrent read re-cache the old row). Other workers' local entries expire within
+`guest_identity_cache_ttl_seconds`, so keep that short.
+
+A read that missed can still be slower than the invalidation: it loads the old row, the
+commit and the invalidation happen, then it writes the old row back. So each key has a
+generation (`...:gen`) that invalidation increments; a miss reads it with the value and writes
+only if it is unchanged (one Lua script). The per-worker tier does the same with a counter.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.redis import get_redis
+from app.models.guest import Guest
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "guest_identity_invalidations"
+_NOT_A_GUEST = ""
+_GEN_SUFFIX = ":gen"
+
+# KEYS[1] value, KEYS[2] generation; ARGV: generation read before the DB query, value, ttl.
+_SET_IF_CURRENT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+_tasks: set[asyncio.Task] = set()  # strong refs until the delete finishes
+
+
+@dataclass(frozen=True)
+class GuestIdentity:
+    """What the bot needs to address the sender (same attribute names as Guest)."""
+
+    id: UUID
+    name: Optional[str]
+    phone: str
+
+    def to_json(self) -> str:
+        return json.dumps({"id": str(self.id), "name": self.name, "phone": self.phone})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "GuestIdentity":
+        data = json.loads(raw)
+        return cls(id=UUID(data["id"]), name=data["name"], phone=data["phone"])
+
+
+class GuestIdentityCache:
+    """Per-worker LRU of telegram identities with TTL, backed by Redis."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[UUID, int], tuple[float, Optional[GuestIdentity]]] = OrderedDict()
+        self._generation = 0  # bumped by every invalidation in this worker
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(restaurant_id: UUID, telegram_id: int) -> str:
+        return f"guest:tg:{restaurant_id}:{telegram_id}"
+
+    def _remember(self, key: tuple[UUID, int], identity: Optional[GuestIdentity]) -> None:
+        self._entries[key] = (time.monotonic(), identity)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def resolve(
+        self, db: AsyncSession, restaurant_id: UUID, telegram_id: int
+    ) -> Optional[GuestIdentity]:
+        """Guest linked to telegram_id in the restaurant (None if none); Redis or DB on miss."""
+        key = (restaurant_id, telegram_id)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        redis_key = self._key(restaurant_id, telegram_id)
+        raw = generation = None
+        redis_ok = True
+        try:
+            raw, generation = await get_redis().mget(redis_key, redis_key + _GEN_SUFFIX)
+        except Exception:
+            logger.warning("Guest identity cache: Redis read failed", exc_info=True)
+            redis_ok = False
+        if raw is not None:
+            identity = GuestIdentity.from_json(raw) if raw != _NOT_A_GUEST else None
+            self._remember(key, identity)
+            self.redis_hits += 1
+            return identity
+        self.misses += 1
+        local_generation = self._generation
+        row = (
+            await db.execute(
+                select(Guest.id, Guest.name, Guest.phone).where(
+                    Guest.restaurant_id == restaurant_id, Guest.telegram_id == telegram_id
+                )
+            )
+        ).one_or_none()
+        identity = GuestIdentity(*row) if row is not None else None
+        if local_generation == self._generation:
+            self._remember(key, identity)
+        if redis_ok:
+            if identity is not None:
+                value, ttl = identity.to_json(), settings.guest_identity_cache_redis_ttl_seconds
+            else:
+                value, ttl = _NOT_A_GUEST, settings.guest_identity_cache_negative_ttl_seconds
+            try:
+                await get_redis().eval(
+                    _SET_IF_CURRENT,
+                    2,
+                    redis_key,
+                    redis_key + _GEN_SUFFIX,
+                    generation or "0",
+                    value,
+                    ttl,
+                )
+            except Exception:
+                logger.warning("Guest identity cache: Redis write failed", exc_info=True)
+        return identity
+
+    def invalidate_after_commit(
+        self, db: AsyncSession, restaurant_id: UUID, telegram_ids: Iterable[Optional[int]]
+    ) -> None:
+        """Queue telegram ids whose guest changed; dropped from both tiers after commit."""
+        pending = db.sync_session.info.setdefault(_PENDING_KEY, set())
+        pending.update((restaurant_id, t) for t in telegram_ids if t is not None)
+
+    async def invalidate(self, keys: Iterable[tuple[UUID, int]]) -> None:
+        keys = list(keys)
+        self._generation += 1
+        for key in keys:
+            self._entries.pop(key, None)
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                for key in keys:
+                    redis_key = self._key(*key)
+                    pipe.delete(redis_key)
+                    # Only has to outlive reads in flight; the TTL just bounds stale keys.
+                    pipe.incr(redis_key + _GEN_SUFFIX)
+                    pipe.expire(
+                        redis_key + _GEN_SUFFIX, settings.guest_identity_cache_redis_ttl_seconds
+                    )
+                await pipe.execute()
+        except Exception:
+            logger.error("Guest identity cache: Redis delete failed: %s", keys, exc_info=True)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+        }
+
+
+guest_identities = GuestIdentityCache(
+    settings.guest_identity_cache_max_entries, settings.guest_identity_cache_ttl_seconds
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    keys = session.info.pop(_PENDING_KEY, None)
+    if keys:
+        task = asyncio.get_running_loop().create_task(guest_identities.invalidate(keys))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
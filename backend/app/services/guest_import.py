@@ -0,0 +1,265 @@
+"""Bulk guest import from CSV / XLSX: streamed, chunked, COPY into staging, merge into guests.
+
+The upload is spooled to a temp file by the endpoint; `run_import` then reads it row by row
+(CSV via the csv module, XLSX via openpyxl read-only mode), so memory stays bounded by one
+chunk. Per chunk, in one short transaction:
+
+  1. normalize / validate rows (bad rows go to the job's error report, the rest continue);
+  2. COPY them into a temp staging table (asyncpg copy_records_to_table);
+  3. update guests matching on (restaurant_id, phone_digits) — any spelling of the number;
+  4. insert the rest ON CONFLICT ON CONSTRAINT uq_guests_restaurant_phone DO UPDATE.
+
+Job progress lives in Redis (`import:{job_id}` hash + capped `import:{job_id}:errors` list), so
+any worker can report it. The running import stamps a heartbeat per chunk; a queued or running
+job whose heartbeat is older than guest_import_stale_seconds (its worker died or restarted) is
+reported, and stored, as failed.
+"""
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from collections.abc import Iterator
+from datetime import date, datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.core.redis import get_redis
+from app.services.guest_identity import guest_identities
+from app.services.phones import normalize_phone
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Accepted header names (lower-cased) per field.
+HEADERS = {
+    "phone": {"phone", "телефон", "тел", "mobile", "номер"},
+    "name": {"name", "имя", "фио", "guest", "гость"},
+    "birthday": {"birthday", "дата рождения", "день рождения", "birth_date", "dob"},
+}
+JOB_TTL_SECONDS = 7 * 24 * 3600
+
+_tasks: set[asyncio.Task] = set()  # strong refs until the import finishes
+
+STAGING = """
+CREATE TEMP TABLE guest_import_staging (
+    row_no integer, phone text, phone_digits text, name text, birthday date
+) ON COMMIT DROP
+"""
+UPDATE_BY_DIGITS = """
+WITH updated AS (
+    UPDATE guests g
+    SET name = COALESCE(s.name, g.name),
+        birthday = COALESCE(s.birthday, g.birthday),
+        updated_at = now()
+    FROM guest_import_staging s
+    WHERE g.restaurant_id = :rid AND g.phone_digits = s.phone_digits
+    RETURNING s.phone_digits, g.telegram_id
+), matched AS (
+    DELETE FROM guest_import_staging s USING updated u WHERE s.phone_digits = u.phone_digits
+)
+SELECT telegram_id FROM updated
+"""
+UPSERT = """
+INSERT INTO guests (id, restaurant_id, phone, phone_digits, name, birthday, preferences,
+                    visit_count, created_at, updated_at)
+SELECT gen_random_uuid(), :rid, phone, phone_digits, name, birthday, '{}'::jsonb, 0, now(), now()
+FROM guest_import_staging
+ON CONFLICT ON CONSTRAINT uq_guests_restaurant_phone DO UPDATE
+SET phone_digits = EXCLUDED.phone_digits,
+    name = COALESCE(EXCLUDED.name, guests.name),
+    birthday = COALESCE(EXCLUDED.birthday, guests.birthday),
+    updated_at = now()
+RETURNING (xmax = 0) AS inserted, telegram_id
+"""
+
+
+def job_key(job_id: str) -> str:
+    return f"import:{job_id}"
+
+
+def _errors_key(job_id: str) -> str:
+    return f"import:{job_id}:errors"
+
+
+def _parse_birthday(value: Any) -> Optional[date]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    raw = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y", "%d.%m.%y"):
+        try:
+            return datetime.strptime(raw, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized birthday: {raw}")
+
+
+def _column_map(header: list[Any]) -> dict[str, int]:
+    columns: dict[str, int] = {}
+    for i, title in enumerate(header):
+        key = str(title or "").strip().lower()
+        for field, names in HEADERS.items():
+            if key in names and field not in columns:
+                columns[field] = i
+    if "phone" not in columns:
+        raise ValueError("No phone column in the header row")
+    return columns
+
+
+def _read_rows(path: str, kind: str) -> Iterator[list[Any]]:
+    """Yield raw rows (header first) without loading the whole file."""
+    if kind == "xlsx":
+        from openpyxl import load_workbook  # optional: only needed for spreadsheet uploads
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            yield from csv.reader(f, dialect)
+
+
+def _chunks(path: str, kind: str, size: int) -> Iterator[tuple[list[tuple], list[tuple[int, str]]]]:
+    """Yield (valid records, errors) per chunk; records are staging rows deduplicated by digits."""
+    rows = _read_rows(path, kind)
+    columns = _column_map(next(rows, []))
+    records: dict[str, tuple] = {}
+    errors: list[tuple[int, str]] = []
+    row_no = 1
+    for row in rows:
+        row_no += 1
+        if not any(v not in (None, "") for v in row):
+            continue
+
+        def cell(field: str) -> Any:
+            i = columns.get(field)
+            return row[i] if i is not None and i < len(row) else None
+
+        phone = str(cell("phone") or "").strip()
+        digits = normalize_phone(phone)
+        if not digits:
+            errors.append((row_no, "Missing or invalid phone"))
+        else:
+            try:
+                birthday = _parse_birthday(cell("birthday"))
+            except ValueError as exc:
+                errors.append((row_no, str(exc)))
+            else:
+                name = str(cell("name") or "").strip() or None
+                # Same number twice in a chunk: the later row wins.
+                records[digits] = (row_no, phone, digits, name, birthday)
+        if len(records) + len(errors) >= size:
+            yield list(records.values()), errors
+            records, errors = {}, []
+    if records or errors:
+        yield list(records.values()), errors
+
+
+async def _merge_chunk(restaurant_id: UUID, records: list[tuple]) -> tuple[int, int]:
+    """COPY one chunk into staging and merge; returns (inserted, updated)."""
+    async with async_session_factory() as session:
+        await session.execute(text(STAGING))
+        raw = await (await session.connection()).get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "guest_import_staging",
+            records=records,
+            columns=["row_no", "phone", "phone_digits", "name", "birthday"],
+        )
+        updated = (await session.execute(text(UPDATE_BY_DIGITS), {"rid": restaurant_id})).all()
+        merged = (await session.execute(text(UPSERT), {"rid": restaurant_id})).all()
+        # Updated names reach the bot's identity cache only if linked guests are dropped from it.
+        guest_identities.invalidate_after_commit(
+            session, restaurant_id, [r.telegram_id for r in (*updated, *merged)]
+        )
+        await session.commit()
+    inserted = sum(1 for r in merged if r.inserted)
+    return inserted, len(updated) + len(merged) - inserted
+
+
+async def create_job(job_id: str, restaurant_id: UUID, filename: str) -> None:
+    await get_redis().hset(
+        job_key(job_id),
+        mapping={
+            "restaurant_id": str(restaurant_id),
+            "filename": filename,
+            "status": "queued",
+            "processed": 0,
+            "inserted": 0,
+            "updated": 0,
+            "failed": 0,
+            "heartbeat": time.time(),
+        },
+    )
+    await get_redis().expire(job_key(job_id), JOB_TTL_SECONDS)
+
+
+async def get_job(job_id: str, restaurant_id: UUID) -> Optional[dict]:
+    redis = get_redis()
+    job = await redis.hgetall(job_key(job_id))
+    if not job or job.get("restaurant_id") != str(restaurant_id):
+        return None
+    if (
+        job["status"] in ("queued", "running")
+        and time.time() - float(job.get("heartbeat", 0)) > settings.guest_import_stale_seconds
+    ):
+        job["status"], job["detail"] = "failed", "Import stopped responding (worker restarted?)"
+        await redis.hset(job_key(job_id), mapping={"status": job["status"], "detail": job["detail"]})
+    job.pop("heartbeat", None)
+    errors = await redis.lrange(_errors_key(job_id), 0, -1)
+    return {**job, "errors": [json.loads(e) for e in errors]}
+
+
+async def run_import(job_id: str, restaurant_id: UUID, path: str, kind: str) -> None:
+    redis = get_redis()
+    key = job_key(job_id)
+    try:
+        await redis.hset(key, mapping={"status": "running", "heartbeat": time.time()})
+        chunks = _chunks(path, kind, settings.guest_import_chunk_size)
+        # Parsing is blocking file / CPU work: do it off the event loop, one chunk at a time.
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            records, errors = chunk
+            inserted, updated = await _merge_chunk(restaurant_id, records) if records else (0, 0)
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hincrby(key, "processed", len(records) + len(errors))
+                pipe.hincrby(key, "inserted", inserted)
+                pipe.hincrby(key, "updated", updated)
+                pipe.hincrby(key, "failed", len(errors))
+                pipe.hset(key, "heartbeat", time.time())
+                if errors:
+                    pipe.rpush(
+                        _errors_key(job_id),
+                        *(json.dumps({"row": n, "error": msg}) for n, msg in errors),
+                    )
+                    pipe.ltrim(_errors_key(job_id), 0, settings.guest_import_max_errors - 1)
+                    pipe.expire(_errors_key(job_id), JOB_TTL_SECONDS)
+                await pipe.execute()
+        await redis.hset(key, "status", "done")
+    except Exception as exc:
+        logger.exception("Guest import %s failed", job_id)
+        await redis.hset(key, mapping={"status": "failed", "detail": str(exc)[:500]})
+    finally:
+        os.unlink(path)
+
+
+def start_import(job_id: str, restaurant_id: UUID, path: str, kind: str) -> None:
+    task = asyncio.get_running_loop().create_task(run_import(job_id, restaurant_id, path, kind))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
@@ -0,0 +1,81 @@
+"""Table occupancy — booked intervals of one table, for in-memory planning.
+
+Intervals of one table never overlap (that is the invariant being enforced), so they are
+kept sorted by start and a conflict check is a bisect + two neighbour comparisons: O(log n).
+The assignment solver (app.services.assignment) loads them per request; writes are guarded by
+the database itself: the `ex_bookings_table_slot` exclusion constraint rejects overlaps
+atomically on any worker.
+"""
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+Interval = tuple[datetime, datetime, UUID]  # (start, end, booking_id)
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC (API clients may omit the offset)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def booking_interval(
+    booked_at: datetime, duration_minutes: int, buffer_minutes: int
+) -> tuple[datetime, datetime]:
+    start = as_utc(booked_at)
+    return start, start + timedelta(minutes=duration_minutes + buffer_minutes)
+
+
+@dataclass
+class TableSlots:
+    """Sorted, non-overlapping intervals of one table ending after `since`."""
+
+    since: datetime
+    intervals: list[Interval] = field(default_factory=list)
+
+    def find_conflict(
+        self, start: datetime, end: datetime, exclude_id: Optional[UUID] = None
+    ) -> Optional[UUID]:
+        """Return id of a booking overlapping [start, end), else None."""
+        i = bisect_left(self.intervals, (start,))
+        # Predecessor may run into `start`; successors may begin before `end`.
+        # Skipping the excluded booking keeps this O(log n) (at most one extra step).
+        j = i - 1
+        while j >= 0:
+            s, e, bid = self.intervals[j]
+            if bid != exclude_id:
+                if e > start:
+                    return bid
+                break
+            j -= 1
+        j = i
+        while j < len(self.intervals):
+            s, e, bid = self.intervals[j]
+            if bid != exclude_id:
+                if s < end:
+                    return bid
+                break
+            j += 1
+        return None
+
+    def overlapping(self, start: datetime, end: datetime) -> list[UUID]:
+        """Ids of all bookings overlapping [start, end)."""
+        i = max(bisect_left(self.intervals, (start,)) - 1, 0)
+        ids = []
+        for s, e, bid in self.intervals[i:]:
+            if s >= end:
+                break
+            if e > start:
+                ids.append(bid)
+        return ids
+
+    def add(self, start: datetime, end: datetime, booking_id: UUID) -> None:
+        insort(self.intervals, (start, end, booking_id))
+
+    def remove(self, start: datetime, end: datetime, booking_id: UUID) -> None:
+        i = bisect_left(self.intervals, (start, end, booking_id))
+        if i < len(self.intervals) and self.intervals[i][2] == booking_id:
+            del self.intervals[i]
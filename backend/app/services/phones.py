@@ -0,0 +1,122 @@
+"""Phone normalization to E.164 digits (no '+') and the keyset backfill of guests.phone_digits.
+
+"+992 90 123 45 67", "992901234567", "00992901234567" and the local "90-123-45-67" all become
+"992901234567": non-digits are dropped, an international "00" prefix is removed, and a number
+of `local_phone_length` digits gets `default_phone_country_code` prepended.
+`normalized_phone_sql` is the same rule as a SQL expression, for grouping stored raw phones.
+"""
+import re
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import and_, case, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.types import String
+
+from app.core.config import get_settings
+from app.models.guest import Guest
+
+settings = get_settings()
+
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def phone_digits(raw: Optional[str]) -> str:
+    """All digits of `raw`, in order."""
+    return _NON_DIGITS.sub("", raw or "")
+
+
+def normalize_phone(raw: Optional[str]) -> Optional[str]:
+    """E.164 digits for a full phone number, or None if it has no digits."""
+    digits = phone_digits(raw)
+    if not digits:
+        return None
+    if digits.startswith("00"):
+        digits = digits[2:]
+    elif len(digits) == settings.local_phone_length and not (raw or "").lstrip().startswith("+"):
+        digits = settings.default_phone_country_code + digits
+    return digits
+
+
+def normalized_phone_sql(raw: ColumnElement[str]) -> ColumnElement[str]:
+    """normalize_phone as SQL over a raw phone column ('' instead of None when no digits)."""
+    digits = func.regexp_replace(raw, r"\D", "", "g", type_=String)
+    return case(
+        (digits.startswith("00"), func.substr(digits, 3)),
+        (
+            and_(
+                func.length(digits) == settings.local_phone_length,
+                ~raw.regexp_match(r"^\s*\+"),
+            ),
+            settings.default_phone_country_code + digits,
+        ),
+        else_=digits,
+    )
+
+
+async def backfill_phone_digits(
+    db: AsyncSession, after_id: Optional[UUID], batch_size: int
+) -> tuple[Optional[UUID], list[tuple[UUID, UUID]]]:
+    """Normalize the next `batch_size` guests by id that lack phone_digits.
+
+    Returns the last id (None = done) and the guests skipped because another guest of the
+    restaurant already has the number, as (skipped id, holder id) pairs to merge. Phones
+    without any digit stay NULL.
+    """
+    q = (
+        select(Guest.id, Guest.restaurant_id, Guest.phone)
+        .where(Guest.phone_digits.is_(None))
+        .order_by(Guest.id)
+        .limit(batch_size)
+    )
+    if after_id is not None:
+        q = q.where(Guest.id > after_id)
+    rows = (await db.execute(q)).all()
+    if not rows:
+        return None, []
+    skipped: list[tuple[UUID, UUID]] = []
+    first: dict[tuple[UUID, str], UUID] = {}  # same number twice in the batch: lower id wins
+    for r in rows:
+        digits = normalize_phone(r.phone)
+        if not digits:
+            continue
+        holder = first.setdefault((r.restaurant_id, digits), r.id)
+        if holder != r.id:
+            skipped.append((r.id, holder))
+    if first:
+        batch = values(
+            column("id", PGUUID(as_uuid=True)),
+            column("restaurant_id", PGUUID(as_uuid=True)),
+            column("digits", String),
+            name="batch",
+        ).data([(guest_id, rid, digits) for (rid, digits), guest_id in first.items()])
+        taken = dict(
+            (
+                await db.execute(
+                    select(batch.c.id, Guest.id).join(
+                        Guest,
+                        and_(
+                            Guest.restaurant_id == batch.c.restaurant_id,
+                            Guest.phone_digits == batch.c.digits,
+                        ),
+                    )
+                )
+            ).all()
+        )
+        skipped.extend(taken.items())
+        todo = [
+            (guest_id, digits) for (_, digits), guest_id in first.items() if guest_id not in taken
+        ]
+        if todo:
+            batch = values(
+                column("id", PGUUID(as_uuid=True)), column("digits", String), name="batch"
+            ).data(todo)
+            await db.execute(
+                update(Guest)
+                .where(Guest.id == batch.c.id)
+                .values(phone_digits=batch.c.digits)
+                .execution_options(synchronize_session=False)
+            )
+    return rows[-1].id, skipped
@@ -0,0 +1,89 @@
+"""Guest preference filters (the `pref` syntax) and the batched normalization backfill.
+
+Promoted keys and their normalization live in app.core.preferences. Filter terms (ANDed), all
+served by the GIN (default jsonb_ops) index on guests.preferences:
+  "vegetarian"       promoted boolean is true   -> preferences @> '{"vegetarian": true}'
+  "wifi_password"    any other key exists       -> preferences ? 'wifi_password'
+  "seating:window"   key has value (containment) -> preferences @> '{"seating": "window"}'
+  "allergies:nuts"   list key contains the value -> preferences @> '{"allergies": ["nuts"]}'
+Values of promoted keys are parsed with their type ("vegetarian:false" is a boolean).
+"""
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, column, select, true, update, values
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.preferences import PROMOTED, is_list, normalize_preferences, normalize_value
+from app.models.guest import Guest
+
+
+def preference_filter(terms: list[str]) -> ColumnElement[bool]:
+    """SQL predicate for `pref` filter terms; ValueError on a malformed term."""
+    contains: dict[str, Any] = {}
+    clauses = []
+    for term in terms:
+        key, sep, raw = term.partition(":")
+        key = key.strip()
+        if not key:
+            raise ValueError(f"Invalid preference filter {term!r}")
+        if not sep:
+            if PROMOTED.get(key) is bool:
+                contains[key] = True
+            else:
+                clauses.append(Guest.preferences.has_key(key))
+            continue
+        if key not in PROMOTED:
+            contains[key] = raw.strip()
+            continue
+        try:
+            value = normalize_value(key, raw)
+        except ValueError:
+            raise ValueError(f"Invalid preference filter {term!r}")
+        if is_list(key):
+            contains.setdefault(key, []).append(value)
+        else:
+            contains[key] = value
+    if contains:
+        clauses.append(Guest.preferences.contains(contains))
+    return and_(true(), *clauses)
+
+
+async def backfill_preferences(
+    db: AsyncSession, after_id: Optional[UUID], batch_size: int
+) -> tuple[Optional[UUID], int, list[UUID]]:
+    """Normalize promoted keys of the next `batch_size` guests by id.
+
+    Returns the last id (None = done), the number of rows rewritten (only changed rows are
+    written) and the guests left as they are because a promoted value does not fit its type.
+    """
+    # Locked: a concurrent edit of the same guest waits instead of being overwritten.
+    q = select(Guest.id, Guest.preferences).order_by(Guest.id).limit(batch_size).with_for_update()
+    if after_id is not None:
+        q = q.where(Guest.id > after_id)
+    rows = (await db.execute(q)).all()
+    if not rows:
+        return None, 0, []
+    changed: list[tuple[UUID, dict]] = []
+    invalid: list[UUID] = []
+    for r in rows:
+        try:
+            prefs = normalize_preferences(r.preferences)
+        except ValueError:
+            invalid.append(r.id)
+            continue
+        if prefs != r.preferences:
+            changed.append((r.id, prefs))
+    if changed:
+        batch = values(
+            column("id", PGUUID(as_uuid=True)), column("prefs", JSONB), name="batch"
+        ).data(changed)
+        await db.execute(
+            update(Guest)
+            .where(Guest.id == batch.c.id)
+            .values(preferences=batch.c.prefs)
+            .execution_options(synchronize_session=False)
+        )
+    return rows[-1].id, len(changed), invalid
@@ -0,0 +1,164 @@
+"""Authenticated principal cache — skips the `users` lookup on every request.
+
+Two tiers keyed by user id: a per-worker TTL + LRU dict, and optionally Redis shared by all
+workers (`principal_cache_redis`). Entries hold only what authorization needs. `update_user`
+calls `invalidate_after_commit()`: both tiers are dropped once the transaction commits
+(dropping them earlier would let a concurrent request re-cache the old row); other workers'
+local entries expire within `principal_cache_ttl_seconds`, so keep that short.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.redis import get_redis
+from app.models.user import User, UserRole
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "principal_invalidations"
+_tasks: set[asyncio.Task] = set()  # strong refs until the delete finishes
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by routers (same attribute names as User)."""
+
+    id: UUID
+    email: Optional[str]  # not in token claims; None when authorized from the token alone
+    role: UserRole
+    restaurant_id: Optional[UUID]
+    is_active: bool
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data.update(
+            id=str(self.id),
+            role=self.role.value,
+            restaurant_id=str(self.restaurant_id) if self.restaurant_id else None,
+        )
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Principal":
+        data = json.loads(raw)
+        return cls(
+            id=UUID(data["id"]),
+            email=data["email"],
+            role=UserRole(data["role"]),
+            restaurant_id=UUID(data["restaurant_id"]) if data["restaurant_id"] else None,
+            is_active=data["is_active"],
+        )
+
+
+class PrincipalCache:
+    """Per-worker LRU of principals with TTL, backed by an optional Redis tier."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[UUID, tuple[float, Principal]] = OrderedDict()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(user_id: UUID) -> str:
+        return f"principal:{user_id}"
+
+    def _remember(self, principal: Principal) -> None:
+        self._entries[principal.id] = (time.monotonic(), principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+        """Principal for user_id (None if no such user); loads from Redis or DB on miss."""
+        entry = self._entries.get(user_id)
+        if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+        if settings.principal_cache_redis:
+            try:
+                raw = await get_redis().get(self._key(user_id))
+            except Exception:
+                logger.warning("Principal cache: Redis read failed", exc_info=True)
+                raw = None
+            if raw is not None:
+                principal = Principal.from_json(raw)
+                self._remember(principal)
+                self.redis_hits += 1
+                return principal
+        self.misses += 1
+        row = (
+            await db.execute(
+                select(User.id, User.email, User.role, User.restaurant_id, User.is_active).where(
+                    User.id == user_id
+                )
+            )
+        ).one_or_none()
+        if row is None:
+            return None
+        principal = Principal(*row)
+        self._remember(principal)
+        if settings.principal_cache_redis:
+            try:
+                await get_redis().set(
+                    self._key(user_id), principal.to_json(), ex=settings.principal_cache_redis_ttl_seconds
+                )
+            except Exception:
+                logger.warning("Principal cache: Redis write failed", exc_info=True)
+        return principal
+
+    def invalidate_after_commit(self, db: AsyncSession, user_id: UUID) -> None:
+        """Queue user_id; its cached principal is dropped from both tiers after commit."""
+        db.sync_session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+    async def invalidate(self, user_id: UUID) -> None:
+        self._entries.pop(user_id, None)
+        if settings.principal_cache_redis:
+            try:
+                await get_redis().delete(self._key(user_id))
+            except Exception:
+                logger.warning("Principal cache: Redis delete failed", exc_info=True)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+        }
+
+
+principals = PrincipalCache(settings.principal_cache_max_entries, settings.principal_cache_ttl_seconds)
+
+
+async def _invalidate_all(user_ids: set[UUID]) -> None:
+    for user_id in user_ids:
+        await principals.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    if user_ids:
+        task = asyncio.get_running_loop().create_task(_invalidate_all(user_ids))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,67 @@
+"""Redis token-bucket rate limiter (shared by all workers).
+
+A bucket holds up to `capacity` tokens and refills at `per_second`. `take()` atomically takes
+one token from every bucket given, or from none if any is empty, and reports how long to wait.
+"""
+import logging
+import math
+from dataclasses import dataclass
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# KEYS: bucket keys; ARGV: capacity, per_second pairs per key. Returns {allowed, wait_seconds}.
+_TAKE = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    levels[i] = tokens
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+end
+local allowed = wait == 0 and 1 or 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    redis.call('HSET', key, 'tokens', levels[i] - allowed, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return {allowed, tostring(wait)}
+"""
+
+
+@dataclass(frozen=True)
+class Bucket:
+    key: str
+    capacity: int
+    per_second: float
+
+
+async def take(*buckets: Bucket) -> float:
+    """Take a token from each bucket; 0 if allowed, else seconds until retry.
+
+    Fails open (allows) when Redis is unavailable, so an outage does not lock everyone out.
+    """
+    args: list = []
+    for b in buckets:
+        args.extend((b.capacity, b.per_second))
+    try:
+        allowed, wait = await get_redis().eval(_TAKE, len(buckets), *(b.key for b in buckets), *args)
+    except Exception:
+        logger.warning("Rate limiter unavailable; allowing request", exc_info=True)
+        return 0.0
+    return 0.0 if int(allowed) else max(float(wait), 0.001)
+
+
+def retry_after(wait: float) -> str:
+    return str(math.ceil(wait))
@@ -0,0 +1,92 @@
+"""Refresh token store in Redis: single use with rotation, reuse detection, logout everywhere.
+
+Every refresh token has a `jti` and a `fam` (login family; rotation keeps the family). All keys
+expire with the refresh-token lifetime, so the store stays bounded; every operation is O(1):
+
+  auth:rt:{jti}          family   — issued and not yet used
+  auth:rt_used:{jti}     family   — already rotated; presenting it again is reuse
+                                    (set in the same Lua call that consumes auth:rt:{jti})
+  auth:rt_revoked:{fam}  1        — family revoked (reuse detected or logout)
+  auth:rt_gen:{user_id}  n        — "logout everywhere" generation; tokens with gen < n die
+
+Reuse of a rotated token means it was copied, so the whole family (including the holder's
+current token) is revoked.
+"""
+import logging
+import time
+from typing import Optional
+from uuid import UUID, uuid4
+
+from app.core.config import get_settings
+from app.core.redis import get_redis
+from app.core.security import create_refresh_token
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+# KEYS: rt, rt_used, rt_gen, rt_revoked; ARGV: rt_used TTL.
+# Returns {stored family or "", was already used, generation, family revoked}.
+_CONSUME = """
+local used = redis.call('EXISTS', KEYS[2])
+local stored = redis.call('GETDEL', KEYS[1])
+if stored then
+    redis.call('SET', KEYS[2], stored, 'EX', ARGV[1])
+end
+return {stored or '', used, redis.call('GET', KEYS[3]) or '0', redis.call('EXISTS', KEYS[4])}
+"""
+
+
+def _ttl() -> int:
+    return settings.refresh_token_expire_days * 24 * 3600
+
+
+def _remaining(payload: dict) -> int:
+    return max(int(payload.get("exp", 0) - time.time()), 1)
+
+
+class RefreshTokenStore:
+    async def issue(self, user_id: UUID, family: Optional[str] = None) -> str:
+        """New refresh token (new family on login, same family on rotation)."""
+        redis = get_redis()
+        jti, family = uuid4().hex, family or uuid4().hex
+        generation = int(await redis.get(f"auth:rt_gen:{user_id}") or 0)
+        await redis.set(f"auth:rt:{jti}", family, ex=_ttl())
+        return create_refresh_token(user_id, jti=jti, family=family, generation=generation)
+
+    async def consume(self, payload: dict) -> Optional[tuple[UUID, str]]:
+        """Use a decoded refresh token once. Returns (user_id, family), or None if rejected."""
+        jti, family, sub = payload.get("jti"), payload.get("fam"), payload.get("sub")
+        if not jti or not family or not sub:
+            return None  # issued before the store existed
+        user_id = UUID(sub)
+        stored, used, generation, revoked = await get_redis().eval(
+            _CONSUME,
+            4,
+            f"auth:rt:{jti}",
+            f"auth:rt_used:{jti}",
+            f"auth:rt_gen:{user_id}",
+            f"auth:rt_revoked:{family}",
+            _remaining(payload),
+        )
+        if not stored:
+            if int(used):
+                logger.warning("Refresh token reuse for user %s; revoking family %s", user_id, family)
+                await self.revoke_family(family)
+            return None
+        if int(revoked) or payload.get("gen", 0) < int(generation) or stored != family:
+            return None
+        return user_id, family
+
+    async def revoke_family(self, family: str) -> None:
+        await get_redis().set(f"auth:rt_revoked:{family}", 1, ex=_ttl())
+
+    async def revoke_user(self, user_id: UUID) -> None:
+        """Logout everywhere: every refresh token issued so far to this user is rejected."""
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.incr(f"auth:rt_gen:{user_id}")
+            pipe.expire(f"auth:rt_gen:{user_id}", _ttl())
+            await pipe.execute()
+
+
+refresh_tokens = RefreshTokenStore()
@@ -0,0 +1,108 @@
+"""Access-token version floor per user, kept in Redis for O(1) checks.
+
+Access tokens carry the user's `token_version` (`ver`). Changing a user's role or deactivating
+them bumps `users.token_version`; after the transaction commits, `auth:token_version:{id}` is
+raised to the new value with a TTL of one access-token lifetime. A token is current unless its
+`ver` is below that floor.
+
+Revocation fails closed: a missing key (expired, evicted, flushed) is refilled from
+`users.token_version`, and a failed write after commit is retried until it lands or one
+access-token lifetime has passed (by then every older token has expired). The floor only
+ever moves up, so a refill racing a bump cannot lower it.
+"""
+import asyncio
+import logging
+import time
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.redis import get_redis
+from app.models.user import User
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "token_versions"
+_tasks: set[asyncio.Task] = set()  # strong refs until the write finishes
+
+# KEYS: floor key; ARGV: version, ttl. Sets the floor unless it is already higher.
+_RAISE_FLOOR = """
+local current = tonumber(redis.call('GET', KEYS[1]))
+if current and current > tonumber(ARGV[1]) then
+    return current
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return tonumber(ARGV[1])
+"""
+
+
+def _key(user_id: UUID) -> str:
+    return f"auth:token_version:{user_id}"
+
+
+def record_bump(db: AsyncSession, user_id: UUID, version: int) -> None:
+    """Queue the new version floor; it is written to Redis once the transaction commits."""
+    db.sync_session.info.setdefault(_PENDING_KEY, {})[user_id] = version
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    bumps = session.info.pop(_PENDING_KEY, None)
+    if bumps:
+        task = asyncio.get_running_loop().create_task(_write(bumps))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _ttl() -> int:
+    return settings.access_token_expire_minutes * 60
+
+
+async def _raise_floor(user_id: UUID, version: int) -> int:
+    return int(await get_redis().eval(_RAISE_FLOOR, 1, _key(user_id), version, _ttl()))
+
+
+async def _write(bumps: dict[UUID, int]) -> None:
+    deadline = time.monotonic() + _ttl()
+    delay = 0.5
+    pending = dict(bumps)
+    while pending:
+        for user_id, version in list(pending.items()):
+            try:
+                await _raise_floor(user_id, version)
+            except Exception:
+                logger.warning("Writing token version floor failed; retrying: %s", user_id, exc_info=True)
+            else:
+                del pending[user_id]
+        if not pending:
+            return
+        if time.monotonic() + delay > deadline:
+            logger.error("Giving up on token version floors (tokens have expired): %s", list(pending))
+            return
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 30.0)
+
+
+async def is_current(db: AsyncSession, user_id: UUID, version: int) -> bool:
+    """True unless the token version is below the user's floor. Raises if Redis is unavailable.
+
+    A missing floor is refilled from users.token_version (an unknown user is never current).
+    """
+    floor = await get_redis().get(_key(user_id))
+    if floor is None:
+        db_version = (
+            await db.execute(select(User.token_version).where(User.id == user_id))
+        ).scalar_one_or_none()
+        if db_version is None:
+            return False
+        floor = await _raise_floor(user_id, db_version)
+    return version >= int(floor)
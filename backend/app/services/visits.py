@@ -0,0 +1,85 @@
+"""Guest visit counters: visit_count, first_visit_at, last_visit_at.
+
+A visit is a booking the guest arrived for: `arrived_at IS NOT NULL` (`VISITED`). It is counted
+when the booking becomes `arrived` (check-in); a later `completed` or `cancelled` does not
+change that, so nothing is counted again or taken back. Counters are bumped with one atomic UPDATE (`visit_count =
+visit_count + n`) in the transition's transaction — no read-modify-write race between workers.
+
+`recompute_visit_counters` rebuilds them from bookings for one keyset batch of guests
+(backfill, repair).
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import DateTime, Integer, and_, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.booking import Booking
+from app.models.guest import Guest
+
+VISITED = Booking.arrived_at.is_not(None)
+
+
+async def record_visits(db: AsyncSession, visits: Sequence[tuple[UUID, datetime]]) -> None:
+    """Count visits (guest_id, arrived_at) in one UPDATE over all affected guests."""
+    if not visits:
+        return
+    per_guest: dict[UUID, list[datetime]] = defaultdict(list)
+    for guest_id, at in visits:
+        per_guest[guest_id].append(at)
+    batch = values(
+        column("guest_id", PGUUID(as_uuid=True)),
+        column("n", Integer),
+        column("first_at", DateTime(timezone=True)),
+        column("last_at", DateTime(timezone=True)),
+        name="visits",
+    ).data([(g, len(ats), min(ats), max(ats)) for g, ats in per_guest.items()])
+    await db.execute(
+        update(Guest)
+        .where(Guest.id == batch.c.guest_id)
+        .values(
+            visit_count=Guest.visit_count + batch.c.n,
+            first_visit_at=func.least(Guest.first_visit_at, batch.c.first_at),
+            last_visit_at=func.greatest(Guest.last_visit_at, batch.c.last_at),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def recompute_visit_counters(
+    db: AsyncSession, after_id: Optional[UUID], batch_size: int
+) -> Optional[UUID]:
+    """Recompute counters for the next `batch_size` guests by id; returns the last id (None = done).
+
+    The batch's guest rows are locked first, so a concurrent check-in either is already visible
+    to the count or waits and increments the recomputed value.
+    """
+    q = select(Guest.id).order_by(Guest.id).limit(batch_size).with_for_update()
+    if after_id is not None:
+        q = q.where(Guest.id > after_id)
+    ids = list((await db.execute(q)).scalars().all())
+    if not ids:
+        return None
+    stats = (
+        select(
+            Guest.id.label("guest_id"),
+            func.count(Booking.id).label("n"),
+            func.min(Booking.arrived_at).label("first_at"),
+            func.max(Booking.arrived_at).label("last_at"),
+        )
+        .select_from(Guest)
+        .outerjoin(Booking, and_(Booking.guest_id == Guest.id, VISITED))
+        .where(Guest.id.in_(ids))
+        .group_by(Guest.id)
+        .subquery()
+    )
+    await db.execute(
+        update(Guest)
+        .where(Guest.id == stats.c.guest_id)
+        .values(visit_count=stats.c.n, first_visit_at=stats.c.first_at, last_visit_at=stats.c.last_at)
+        .execution_options(synchronize_session=False)
+    )
+    return ids[-1]
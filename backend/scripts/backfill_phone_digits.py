@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Fill guests.phone_digits (normalized E.164 digits) for existing rows.
+   Walks guests by id in keyset batches; each batch is its own short transaction, so it can
+   run on a live database.
+   Resumable: the last finished id is checkpointed in Redis and picked up on the next run.
+   Guests whose number another guest of the restaurant already has are skipped and listed
+   at the end: merge them (POST /guests/:id/merge) and rerun with BACKFILL_RESTART=1.
+   Run from backend/ with venv active (after alembic upgrade head):
+   python scripts/backfill_phone_digits.py
+   Batch size via BACKFILL_BATCH (default 5000); BACKFILL_AFTER=<guest id> starts after that id,
+   BACKFILL_RESTART=1 ignores the checkpoint.
+"""
+import asyncio
+import os
+import sys
+from uuid import UUID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import async_session_factory, engine
+from app.core.redis import close_redis, get_redis
+from app.services.phones import backfill_phone_digits
+
+CHECKPOINT_KEY = "backfill:phone_digits:last_id"
+
+
+async def main() -> None:
+    batch_size = int(os.environ.get("BACKFILL_BATCH", "5000"))
+    redis = get_redis()
+    after = os.environ.get("BACKFILL_AFTER")
+    if after is None and os.environ.get("BACKFILL_RESTART") != "1":
+        after = await redis.get(CHECKPOINT_KEY)
+    last_id = UUID(after) if after else None
+    if last_id:
+        print(f"Resuming after guest {last_id}")
+    batches = 0
+    skipped: list[tuple[UUID, UUID]] = []
+    try:
+        while True:
+            async with async_session_factory() as session:
+                next_id, conflicts = await backfill_phone_digits(session, last_id, batch_size)
+                await session.commit()
+            if next_id is None:
+                break
+            last_id = next_id
+            skipped.extend(conflicts)
+            await redis.set(CHECKPOINT_KEY, str(last_id))
+            batches += 1
+            print(f"{batches * batch_size} guests normalized (last id {last_id})")
+        await redis.delete(CHECKPOINT_KEY)
+    finally:
+        await engine.dispose()
+        await close_redis()
+    for guest_id, holder_id in skipped:
+        print(f"Skipped guest {guest_id}: same number as guest {holder_id}")
+    print(f"Done ({len(skipped)} skipped)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
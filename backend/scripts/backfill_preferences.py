@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Normalize promoted keys in guests.preferences for rows written before normalization.
+   Walks guests by id in keyset batches; each batch is its own short transaction that locks
+   only that batch's guest rows, so it can run on a live database.
+   Resumable: the last finished id is checkpointed in Redis and picked up on the next run.
+   Guests with a promoted value that does not fit its type are left as they are and listed
+   at the end: fix them (PATCH /guests/:id) and rerun with BACKFILL_RESTART=1.
+   Run from backend/ with venv active (after alembic upgrade head):
+   python scripts/backfill_preferences.py
+   Batch size via BACKFILL_BATCH (default 2000); BACKFILL_AFTER=<guest id> starts after that id,
+   BACKFILL_RESTART=1 ignores the checkpoint.
+"""
+import asyncio
+import os
+import sys
+from uuid import UUID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import async_session_factory, engine
+from app.core.redis import close_redis, get_redis
+from app.services.preferences import backfill_preferences
+
+CHECKPOINT_KEY = "backfill:preferences:last_id"
+
+
+async def main() -> None:
+    batch_size = int(os.environ.get("BACKFILL_BATCH", "2000"))
+    redis = get_redis()
+    after = os.environ.get("BACKFILL_AFTER")
+    if after is None and os.environ.get("BACKFILL_RESTART") != "1":
+        after = await redis.get(CHECKPOINT_KEY)
+    last_id = UUID(after) if after else None
+    if last_id:
+        print(f"Resuming after guest {last_id}")
+    rewritten = 0
+    invalid: list[UUID] = []
+    try:
+        while True:
+            async with async_session_factory() as session:
+                next_id, changed, bad = await backfill_preferences(session, last_id, batch_size)
+                await session.commit()
+            if next_id is None:
+                break
+            last_id = next_id
+            rewritten += changed
+            invalid.extend(bad)
+            await redis.set(CHECKPOINT_KEY, str(last_id))
+            print(f"{rewritten} guests normalized (last id {last_id})")
+        await redis.delete(CHECKPOINT_KEY)
+    finally:
+        await engine.dispose()
+        await close_redis()
+    for guest_id in invalid:
+        print(f"Invalid promoted preference: guest {guest_id}")
+    print(f"Done: {rewritten} normalized, {len(invalid)} invalid")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
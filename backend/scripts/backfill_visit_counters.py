@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Recompute guests.visit_count / first_visit_at / last_visit_at from bookings.
+   Walks guests by id in keyset batches; each batch is its own short transaction that locks
+   only that batch's guest rows, so it can run on a live database.
+   Resumable: the last finished id is checkpointed in Redis and picked up on the next run.
+   Run from backend/ with venv active (after alembic upgrade head):
+   python scripts/backfill_visit_counters.py
+   Batch size via BACKFILL_BATCH (default 1000); BACKFILL_AFTER=<guest id> starts after that id,
+   BACKFILL_RESTART=1 ignores the checkpoint.
+"""
+import asyncio
+import os
+import sys
+from uuid import UUID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import async_session_factory, engine
+from app.core.redis import close_redis, get_redis
+from app.services.visits import recompute_visit_counters
+
+CHECKPOINT_KEY = "backfill:visit_counters:last_id"
+
+
+async def main() -> None:
+    batch_size = int(os.environ.get("BACKFILL_BATCH", "1000"))
+    redis = get_redis()
+    after = os.environ.get("BACKFILL_AFTER")
+    if after is None and os.environ.get("BACKFILL_RESTART") != "1":
+        after = await redis.get(CHECKPOINT_KEY)
+    last_id = UUID(after) if after else None
+    if last_id:
+        print(f"Resuming after guest {last_id}")
+    batches = 0
+    try:
+        while True:
+            async with async_session_factory() as session:
+                next_id = await recompute_visit_counters(session, last_id, batch_size)
+                await session.commit()
+            if next_id is None:
+                break
+            last_id = next_id
+            await redis.set(CHECKPOINT_KEY, str(last_id))
+            batches += 1
+            print(f"{batches * batch_size} guests recomputed (last id {last_id})")
+        await redis.delete(CHECKPOINT_KEY)
+    finally:
+        await engine.dispose()
+        await close_redis()
+    print("Done")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
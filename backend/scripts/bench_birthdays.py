@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Upcoming-birthdays latency over a large tenant, including a window that wraps past Dec 31.
+   Seeds BENCH_GUESTS guests with spread-out birthdays into a scratch restaurant with one
+   server-side INSERT ... SELECT, then times upcoming_birthdays() and prints the plan of its
+   query (expected: index scan on ix_guests_restaurant_birthday_mmdd, not a Seq Scan).
+   Run from backend/ with venv active (after alembic upgrade head):
+   python scripts/bench_birthdays.py
+   Size via BENCH_GUESTS (default 1000000), BENCH_ROUNDS.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+from sqlalchemy import delete, event, text
+
+from app.api.v1 import guests
+from app.core.database import async_session_factory, engine
+from app.models.restaurant import Restaurant
+from app.models.user import User, UserRole
+
+# Every day of the year (Feb 29 included) across 1950..2009; a fifth of the guests have none.
+SEED = """
+INSERT INTO guests (id, restaurant_id, phone, name, birthday, visit_count, created_at, updated_at)
+SELECT gen_random_uuid(), :rid,
+       '+992' || lpad(n::text, 9, '0'),
+       'Guest ' || n,
+       CASE WHEN n % 5 = 0 THEN NULL ELSE date '1950-01-01' + (n * 7919) % 21915 END,
+       0, now() - make_interval(secs => n), now()
+FROM generate_series(1, :count) AS n
+"""
+
+WINDOWS = [
+    ("today", date(2026, 6, 15), 0),
+    ("next 7 days", date(2026, 6, 15), 7),
+    ("next 30 days", date(2026, 3, 10), 30),
+    ("wrap Dec 28 +7", date(2026, 12, 28), 7),
+]
+
+captured: list[tuple[str, object]] = []
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _capture(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT"):
+        captured.append((statement, parameters))
+
+
+async def main() -> None:
+    count = int(os.environ.get("BENCH_GUESTS", "1000000"))
+    rounds = int(os.environ.get("BENCH_ROUNDS", "20"))
+    async with async_session_factory() as session:
+        restaurant = Restaurant(name="Birthday bench", timezone="Asia/Dushanbe")
+        session.add(restaurant)
+        await session.flush()
+        rid = restaurant.id
+        print(f"Seeding {count} guests...")
+        await session.execute(text(SEED), {"rid": rid, "count": count})
+        await session.commit()
+        await session.execute(text("ANALYZE guests"))
+        await session.commit()
+    user = User(email="bench@guestflow.local", password_hash="-", role=UserRole.owner, restaurant_id=rid)
+    try:
+        for label, start, days in WINDOWS:
+            timings = []
+            found = 0
+            for _ in range(rounds):
+                async with async_session_factory() as db:
+                    captured.clear()
+                    started = time.perf_counter()
+                    rows = await guests.upcoming_birthdays(
+                        Response(), db, rid, user, days=days, start=start, cursor=None, limit=100
+                    )
+                    timings.append((time.perf_counter() - started) * 1000)
+                    found = len(rows)
+            async with async_session_factory() as db:
+                statement, parameters = captured[-1]
+                conn = await db.connection()
+                plan = (
+                    await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                ).scalar_one()
+            uses_index = "ix_guests_restaurant_birthday_mmdd" in str(plan)
+            timings.sort()
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            print(
+                f"{label:<16} {found:>3} rows  p50={statistics.median(timings):6.1f}ms  "
+                f"p99={p99:6.1f}ms  {'index' if uses_index else 'NO INDEX'}"
+            )
+    finally:
+        async with async_session_factory() as session:
+            await session.execute(delete(Restaurant).where(Restaurant.id == rid))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Guest typeahead latency over a large tenant (target: p99 under 20 ms).
+   Seeds BENCH_GUESTS guests into a scratch restaurant with one server-side INSERT ... SELECT,
+   then times list_guests(search=...) for name and phone fragments as a hostess would type them,
+   next to a second tenant of the same size (the indexes are per restaurant).
+   Exits 1 if any term's p99 is over 20 ms.
+   Run from backend/ with venv active (after alembic upgrade head):
+   python scripts/bench_guest_search.py
+   Size via BENCH_GUESTS (default 1000000), BENCH_ROUNDS (default 200, after one warm-up call
+   per term: statement compile and plan caches are hot on a running server).
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+from sqlalchemy import delete, text
+
+from app.api.v1 import guests
+from app.core.database import async_session_factory, engine
+from app.models.restaurant import Restaurant
+from app.models.user import User, UserRole
+
+SEED = """
+INSERT INTO guests (id, restaurant_id, phone, name, visit_count, created_at, updated_at)
+SELECT gen_random_uuid(), :rid,
+       '+992' || lpad(n::text, 9, '0'),
+       (ARRAY['Алишер','Фарход','Мадина','Зарина','Рустам','Дилноза','Шахзод','Нигина',
+              'Anna','Ivan','Sitora','Bahrom'])[1 + n % 12] || ' ' ||
+       (ARRAY['Каримов','Рахимова','Саидов','Назарова','Юсупов','Ismoilov','Petrova',
+              'Hakimov','Sharipova','Qodirov'])[1 + (n / 12) % 10] || ' ' || (n % 997),
+       0, now() - make_interval(secs => n), now()
+FROM generate_series(1, :count) AS n
+"""
+
+TERMS = ["али", "Алишер Кар", "рахим", "Petrov", "992000", "0012345", "5551", "Sito"]
+
+
+async def main() -> None:
+    count = int(os.environ.get("BENCH_GUESTS", "1000000"))
+    rounds = int(os.environ.get("BENCH_ROUNDS", "200"))
+    async with async_session_factory() as session:
+        restaurants = [Restaurant(name=f"Search bench {i}", timezone="Asia/Dushanbe") for i in range(2)]
+        session.add_all(restaurants)
+        await session.flush()
+        restaurant_ids = [r.id for r in restaurants]
+        rid = restaurant_ids[0]
+        for seed_rid in restaurant_ids:
+            print(f"Seeding {count} guests...")
+            await session.execute(text(SEED), {"rid": seed_rid, "count": count})
+            await session.commit()
+    # Steady state: statistics and visibility map up to date, and the
+    # seed's dirty pages written out (CHECKPOINT: superuser or pg_checkpoint) rather than
+    # flushed by the checkpointer while the timings run
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE guests"))
+        await conn.execute(text("CHECKPOINT"))
+    user = User(email="bench@guestflow.local", password_hash="-", role=UserRole.owner, restaurant_id=rid)
+    slow = 0
+    try:
+        for term in TERMS:
+            timings = []
+            found = 0
+            for i in range(rounds + 1):
+                async with async_session_factory() as db:
+                    started = time.perf_counter()
+                    rows = await guests.list_guests(Response(), db, rid, user, search=term, limit=20)
+                    if i:
+                        timings.append((time.perf_counter() - started) * 1000)
+                    found = len(rows)
+            timings.sort()
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            print(
+                f"{term!r:<16} {found:>2} rows  p50={statistics.median(timings):6.1f}ms  "
+                f"p99={p99:6.1f}ms{'' if p99 < 20 else '  (over 20 ms)'}"
+            )
+            slow += p99 >= 20
+    finally:
+        async with async_session_factory() as session:
+            await session.execute(delete(Restaurant).where(Restaurant.id.in_(restaurant_ids)))
+            await session.commit()
+        await engine.dispose()
+    if slow:
+        print(f"{slow} terms over the 20 ms p99 target")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Latency of unrelated requests on one worker while logins hash passwords.
+   Compares bcrypt inline on the event loop (old behaviour) with the hashing thread pool.
+   A probe coroutine stands in for a cheap endpoint (GET /health) every PROBE_INTERVAL_MS;
+   its latency is how long it waited for the event loop.
+   Run from backend/ with venv active (no database needed):
+   python scripts/bench_login_latency.py
+   Size via BENCH_LOGINS (concurrent logins), PROBE_INTERVAL_MS.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.v1.health import health
+from app.core.security import get_password_hash, pwd_context, verify_and_update_password
+
+PASSWORD = "correct horse battery staple"
+
+
+async def login_inline(stored: str) -> None:
+    pwd_context.verify_and_update(PASSWORD, stored)
+
+
+async def login_pooled(stored: str) -> None:
+    await verify_and_update_password(PASSWORD, stored)
+
+
+async def probe(latencies: list[float], interval: float, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        scheduled = time.perf_counter()
+        await asyncio.sleep(interval)
+        await health()
+        latencies.append((time.perf_counter() - scheduled - interval) * 1000)
+
+
+async def run(label: str, login, stored: str, logins: int, interval: float) -> None:
+    latencies: list[float] = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(latencies, interval, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(login(stored) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+    latencies.sort()
+    p50 = statistics.median(latencies) if latencies else 0.0
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+    print(
+        f"{label:<8} {logins} logins in {elapsed:.2f}s | probe n={len(latencies)} "
+        f"p50={p50:.1f}ms p99={p99:.1f}ms max={max(latencies, default=0.0):.1f}ms"
+    )
+
+
+async def main() -> None:
+    logins = int(os.environ.get("BENCH_LOGINS", "32"))
+    interval = int(os.environ.get("PROBE_INTERVAL_MS", "5")) / 1000
+    stored = get_password_hash(PASSWORD)
+    await run("inline", login_inline, stored, logins, interval)
+    await run("pooled", login_pooled, stored, logins, interval)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
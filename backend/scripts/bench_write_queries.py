@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Count SQL statements per write handler (create/update table, guest, booking).
+   Run from backend/ with venv active (after alembic upgrade head):
+   python scripts/bench_write_queries.py
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, event
+
+from app.api.v1 import bookings, guests, tables
+from app.core.database import async_session_factory, engine
+from app.models.restaurant import Restaurant
+from app.models.user import User, UserRole
+from app.schemas.booking import BookingCreate, BookingUpdate
+from app.schemas.guest import GuestCreate, GuestUpdate
+from app.schemas.table import TableCreate, TableUpdate
+
+statements: list[str] = []
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement.split(None, 1)[0].upper())
+
+
+async def measure(label: str, call) -> object:
+    async with async_session_factory() as session:
+        statements.clear()
+        result = await call(session)
+        count = len(statements)
+        await session.commit()
+    print(f"{label:<16} {count} statements ({', '.join(statements)})")
+    return result
+
+
+async def main() -> None:
+    async with async_session_factory() as session:
+        restaurant = Restaurant(name="Write bench", timezone="Asia/Dushanbe")
+        session.add(restaurant)
+        await session.flush()
+        user = User(
+            email="bench@guestflow.local",
+            password_hash="-",
+            role=UserRole.owner,
+            restaurant_id=restaurant.id,
+        )
+        session.add(user)
+        await session.commit()
+    rid = restaurant.id
+    try:
+        table = await measure(
+            "create_table", lambda db: tables.create_table(TableCreate(name="B1", capacity=4), db, rid, user)
+        )
+        await measure(
+            "update_table",
+            lambda db: tables.update_table(table.id, TableUpdate(capacity=6), db, rid, user),
+        )
+        guest = await measure(
+            "create_guest",
+            lambda db: guests.create_guest(GuestCreate(phone="+992000000001", name="Bench"), db, rid, user),
+        )
+        await measure(
+            "update_guest",
+            lambda db: guests.update_guest(guest.id, GuestUpdate(name="Bench 2"), db, rid, user),
+        )
+        booked_at = datetime.now(timezone.utc) + timedelta(days=1)
+        booking = await measure(
+            "create_booking",
+            lambda db: bookings.create_booking(
+                BookingCreate(guest_id=guest.id, table_id=table.id, booked_at=booked_at), db, rid, user
+            ),
+        )
+        await measure(
+            "update_booking",
+            lambda db: bookings.update_booking(booking.id, BookingUpdate(guests_count=3), db, rid, user),
+        )
+    finally:
+        async with async_session_factory() as session:
+            await session.execute(delete(User).where(User.restaurant_id == rid))
+            await session.execute(delete(Restaurant).where(Restaurant.id == rid))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
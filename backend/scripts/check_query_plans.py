@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Seed a large synthetic dataset and assert the hot list/get queries use index scans.
+   Captures the SQL the bookings/guests handlers actually emit and runs EXPLAIN on it;
+   exits 1 if any of them falls back to a Seq Scan on bookings or guests.
+   Run from backend/ with venv active (after alembic upgrade head):
+   python scripts/check_query_plans.py
+   Size via PLAN_RESTAURANTS, PLAN_TABLES, PLAN_DAYS, PLAN_GUESTS (per restaurant).
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+from sqlalchemy import delete, event, insert, text
+
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.v1 import bookings, guests
+from app.core.database import async_session_factory, engine
+from app.models.booking import Booking, BookingSource, BookingStatus
+from app.models.guest import Guest
+from app.models.restaurant import Restaurant
+from app.models.restaurant_table import RestaurantTable
+from app.models.user import User, UserRole
+
+WATCHED_TABLES = {"bookings", "guests"}
+
+captured: list[tuple[str, object]] = []
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _capture(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT"):
+        captured.append((statement, parameters))
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """Relations read by Seq Scan anywhere in an EXPLAIN (FORMAT JSON) plan tree."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in WATCHED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def seed(restaurants: int, tables: int, days: int, guests_per: int) -> list:
+    """Insert restaurants with tables, guests and non-overlapping bookings; return restaurant ids."""
+    start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    statuses = list(BookingStatus)
+    ids = []
+    async with async_session_factory() as session:
+        for r in range(restaurants):
+            rid = uuid4()
+            ids.append(rid)
+            await session.execute(
+                insert(Restaurant), [{"id": rid, "name": f"Plan check {r}", "timezone": "UTC"}]
+            )
+            table_ids = [uuid4() for _ in range(tables)]
+            await session.execute(
+                insert(RestaurantTable),
+                [
+                    {"id": t, "restaurant_id": rid, "name": f"T{i}", "capacity": 2 + i % 6}
+                    for i, t in enumerate(table_ids)
+                ],
+            )
+            guest_ids = [uuid4() for _ in range(guests_per)]
+            await session.execute(
+                insert(Guest),
+                [
+                    {
+                        "id": g,
+                        "restaurant_id": rid,
+                        "phone": f"+992{r:03d}{i:07d}",
+                        "name": f"Guest {i}",
+                        "visit_count": 0,
+                    }
+                    for i, g in enumerate(guest_ids)
+                ],
+            )
+            # 2-hour steps keep every table slot (<= 105 min) clear of the exclusion constraint.
+            rows = []
+            for day in range(days):
+                for slot in range(12):
+                    booked_at = start + timedelta(days=day, hours=2 * slot)
+                    for i, table_id in enumerate(table_ids):
+                        n = len(rows)
+                        rows.append(
+                            {
+                                "restaurant_id": rid,
+                                "guest_id": guest_ids[n % len(guest_ids)],
+                                "table_id": table_id,
+                                "booked_at": booked_at,
+                                "duration_minutes": 90,
+                                "buffer_minutes": 15,
+                                "guests_count": 2 + i % 4,
+                                "status": statuses[n % len(statuses)],
+                                "source": BookingSource.manual,
+                            }
+                        )
+            await session.execute(insert(Booking), rows)
+            await session.commit()
+        await session.execute(text("ANALYZE restaurants, tables, guests, bookings"))
+        await session.commit()
+    return ids
+
+
+async def main() -> None:
+    restaurants = int(os.environ.get("PLAN_RESTAURANTS", "20"))
+    tables = int(os.environ.get("PLAN_TABLES", "15"))
+    days = int(os.environ.get("PLAN_DAYS", "60"))
+    guests_per = int(os.environ.get("PLAN_GUESTS", "5000"))
+    print(f"Seeding {restaurants} restaurants x ({tables} tables, {days} days, {guests_per} guests)...")
+    restaurant_ids = await seed(restaurants, tables, days, guests_per)
+    rid = restaurant_ids[len(restaurant_ids) // 2]
+    user = User(
+        id=uuid4(), email="plans@guestflow.local", password_hash="-", role=UserRole.owner, restaurant_id=rid
+    )
+
+    async with async_session_factory() as db:
+        pick = "SELECT id FROM {} WHERE restaurant_id = :r LIMIT 1"
+        some_table = (await db.execute(text(pick.format("tables")), {"r": rid})).scalar_one()
+        some_booking = (await db.execute(text(pick.format("bookings")), {"r": rid})).scalar_one()
+        some_guest = (await db.execute(text(pick.format("guests")), {"r": rid})).scalar_one()
+    day = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=3)
+
+    def list_bookings(**filters):
+        async def call(db):
+            response = Response()
+            await bookings.list_bookings(
+                response, db, rid, user,
+                date_from=filters.get("date_from"), date_to=filters.get("date_to"),
+                status_filter=filters.get("status_filter"), table_id=filters.get("table_id"),
+                guest_id=None, cursor=filters.get("cursor"), skip=0, limit=50,
+            )
+            return response.headers.get(NEXT_CURSOR_HEADER)
+        return call
+
+    def list_guests(cursor=None):
+        async def call(db):
+            response = Response()
+            await guests.list_guests(response, db, rid, user, search=None, cursor=cursor, skip=0, limit=50)
+            return response.headers.get(NEXT_CURSOR_HEADER)
+        return call
+
+    checks = [
+        ("list_bookings", list_bookings()),
+        ("list_bookings day", list_bookings(date_from=day, date_to=day + timedelta(days=1))),
+        ("list_bookings status", list_bookings(status_filter=BookingStatus.confirmed, date_from=day)),
+        ("list_bookings table", list_bookings(table_id=some_table, date_from=day)),
+        ("list_guests", list_guests()),
+        ("get_booking", lambda db: bookings.get_booking(some_booking, db, rid, user)),
+        ("get_guest", lambda db: guests.get_guest(some_guest, db, rid, user)),
+        (
+            "get_guest_profile",
+            lambda db: guests.get_guest_profile(some_guest, Response(), db, rid, user, cursor=None, limit=20),
+        ),
+    ]
+    # Second pages go through the keyset cursor predicate.
+    async with async_session_factory() as db:
+        booking_cursor = await list_bookings()(db)
+        guest_cursor = await list_guests()(db)
+    checks.append(("list_bookings cursor", list_bookings(cursor=booking_cursor)))
+    checks.append(("list_guests cursor", list_guests(cursor=guest_cursor)))
+
+    failures = 0
+    try:
+        for label, call in checks:
+            async with async_session_factory() as db:
+                captured.clear()
+                await call(db)
+                statements = list(captured)
+                for statement, parameters in statements:
+                    conn = await db.connection()
+                    plan = (
+                        await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                    ).scalar_one()
+                    scans = seq_scans(plan[0]["Plan"])
+                    status_line = "Seq Scan on " + ", ".join(scans) if scans else "index"
+                    print(f"{label:<22} {status_line}")
+                    failures += bool(scans)
+    finally:
+        async with async_session_factory() as session:
+            await session.execute(delete(Restaurant).where(Restaurant.id.in_(restaurant_ids)))
+            await session.commit()
+        await engine.dispose()
+
+    if failures:
+        print(f"{failures} hot queries regressed to sequential scans")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+"""Shared fixtures.
+
+`redis`: an in-memory Redis (fakeredis with Lua) in place of app.core.redis.
+`db` / `restaurant_id`: Postgres tests. They run against TEST_DATABASE_URL (a scratch database:
+it is migrated to head and test restaurants are created and deleted in it) and are skipped
+when it is not set.
+"""
+import os
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    # Before any app import: settings, engine and Alembic read DATABASE_URL.
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+
+@pytest.fixture
+async def redis(monkeypatch):
+    client = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr("app.core.redis._client", client)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture(scope="session")
+def migrated_database():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from alembic import command
+    from alembic.config import Config
+
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(backend, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(backend, "alembic"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture
+async def db(migrated_database):
+    from app.core.database import async_session_factory, engine
+
+    async with async_session_factory() as session:
+        yield session
+    await engine.dispose()  # the pool is bound to this test's event loop
+
+
+@pytest.fixture
+async def restaurant_id(db):
+    from sqlalchemy import delete
+
+    from app.models.restaurant import Restaurant
+
+    restaurant = Restaurant(name="Test restaurant", timezone="Asia/Dushanbe")
+    db.add(restaurant)
+    await db.flush()
+    rid = restaurant.id
+    await db.commit()
+    yield rid
+    await db.rollback()
+    await db.execute(delete(Restaurant).where(Restaurant.id == rid))
+    await db.commit()
@@ -0,0 +1,58 @@
+"""POST /bookings under concurrency (Postgres): the exclusion constraint lets exactly one
+overlapping booking in; the rest get 409 with the booking that won."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.security import create_access_token
+from app.main import app
+from app.models.guest import Guest
+from app.models.restaurant_table import RestaurantTable
+from app.models.user import User, UserRole
+
+settings = get_settings()
+
+ATTEMPTS = 200
+
+
+async def test_concurrent_overlapping_bookings_one_wins(db, redis, restaurant_id):
+    guest = Guest(restaurant_id=restaurant_id, phone="+992900000000")
+    table = RestaurantTable(restaurant_id=restaurant_id, name="T1", capacity=4)
+    user = User(
+        email="hostess@guestflow.test", password_hash="-", role=UserRole.owner, restaurant_id=restaurant_id
+    )
+    db.add_all([guest, table, user])
+    await db.flush()
+    guest_id, table_id, user_id = guest.id, table.id, user.id
+    await db.commit()
+    token = create_access_token(user_id, UserRole.owner.value, restaurant_id)
+
+    base = datetime.now(timezone.utc).replace(second=0, microsecond=0) + timedelta(days=1)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as client:
+        # Start times spread over 60 minutes: every pair overlaps (the slot is 90 + 15 minutes).
+        responses = await asyncio.gather(
+            *(
+                client.post(
+                    f"{settings.api_v1_prefix}/bookings",
+                    json={
+                        "guest_id": str(guest_id),
+                        "table_id": str(table_id),
+                        "booked_at": (base + timedelta(minutes=i % 60)).isoformat(),
+                    },
+                )
+                for i in range(ATTEMPTS)
+            )
+        )
+
+    created = [r for r in responses if r.status_code == 201]
+    assert len(created) == 1
+    winner = created[0].json()["id"]
+    rejected = [r for r in responses if r.status_code != 201]
+    assert {r.status_code for r in rejected} == {409}
+    assert {r.json()["detail"]["conflicting_booking"]["id"] for r in rejected} == {winner}
@@ -0,0 +1,39 @@
+"""Duplicate detection (Postgres): one number written in different formats is one cluster."""
+from app.models.guest import Guest
+from app.services.guest_dedup import find_duplicates
+
+
+async def add_guests(db, restaurant_id, *guests: dict) -> list:
+    """Insert one per transaction (created_at = now() differs) and return their ids."""
+    ids = []
+    for fields in guests:
+        guest = Guest(restaurant_id=restaurant_id, **fields)
+        db.add(guest)
+        await db.flush()
+        ids.append(guest.id)
+        await db.commit()
+    return ids
+
+
+async def test_same_number_in_different_formats_is_a_cluster(db, restaurant_id):
+    # The first has phone_digits; the backfill skipped the other two (number already taken).
+    kept, local, international, _ = await add_guests(
+        db,
+        restaurant_id,
+        {"phone": "+992 90 123 45 67", "phone_digits": "992901234567"},
+        {"phone": "90-123-45-67"},
+        {"phone": "00992901234567"},
+        {"phone": "+992 93 000 00 00", "phone_digits": "992930000000"},
+    )
+
+    clusters = await find_duplicates(db, restaurant_id)
+
+    assert len(clusters) == 1
+    assert clusters[0].guest_ids == [kept, local, international]
+    assert clusters[0].reasons == {"phone"}
+
+
+async def test_phones_without_digits_are_not_grouped(db, restaurant_id):
+    await add_guests(db, restaurant_id, {"phone": "n/a"}, {"phone": "unknown"})
+
+    assert await find_duplicates(db, restaurant_id) == []
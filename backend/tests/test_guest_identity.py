@@ -0,0 +1,61 @@
+"""Bot identity cache: a read racing an invalidation must not cache the old row."""
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.services.guest_identity import GuestIdentityCache
+
+
+class _Result:
+    def __init__(self, row):
+        self.row = row
+
+    def one_or_none(self):
+        return self.row
+
+
+class _Db:
+    """Stands in for the session: returns the current guest row, optionally after a pause."""
+
+    def __init__(self, row):
+        self.row = row
+        self.reading = asyncio.Event()
+        self.release = None
+
+    async def execute(self, _query):
+        row = self.row
+        self.reading.set()
+        if self.release is not None:
+            await self.release.wait()
+        return _Result(row)
+
+
+@pytest.fixture
+def cache():
+    return GuestIdentityCache(max_entries=100, ttl_seconds=60)
+
+
+async def test_miss_is_cached_in_both_tiers(redis, cache):
+    rid, guest_id = uuid4(), uuid4()
+    db = _Db((guest_id, "Anna", "+992901234567"))
+    assert (await cache.resolve(db, rid, 42)).name == "Anna"
+    db.row = None
+    assert (await cache.resolve(db, rid, 42)).name == "Anna"
+    assert cache.stats()["misses"] == 1
+    assert await redis.get(f"guest:tg:{rid}:42") is not None
+
+
+async def test_read_racing_an_invalidation_does_not_cache_the_old_row(redis, cache):
+    rid, guest_id = uuid4(), uuid4()
+    db = _Db((guest_id, "Old", "+992901234567"))
+    db.release = asyncio.Event()
+    read = asyncio.create_task(cache.resolve(db, rid, 42))
+    await db.reading.wait()  # the old row is loaded; now the rename commits
+    await cache.invalidate([(rid, 42)])
+    db.release.set()
+    assert (await read).name == "Old"  # that read answers with what it saw...
+    assert await redis.get(f"guest:tg:{rid}:42") is None  # ...but caches nothing
+    db.row, db.release = (guest_id, "New", "+992901234567"), None
+    assert (await cache.resolve(db, rid, 42)).name == "New"
+    assert (await cache.resolve(db, rid, 42)).name == "New"
@@ -0,0 +1,30 @@
+"""Guest typeahead (Postgres): names by prefix first, substring matches when they run out."""
+from fastapi import Response
+
+from app.api.v1.guests import list_guests
+from app.models.guest import Guest
+
+
+async def search(db, restaurant_id, term: str, limit: int) -> list[str]:
+    rows = await list_guests(Response(), db, restaurant_id, None, search=term, limit=limit)
+    return [r.name for r in rows]
+
+
+async def add_guests(db, restaurant_id, *names: str) -> None:
+    for i, name in enumerate(names):
+        db.add(Guest(restaurant_id=restaurant_id, phone=f"+99290000000{i}", name=name))
+    await db.commit()
+
+
+async def test_name_prefix_fills_the_page_in_name_order(db, restaurant_id):
+    await add_guests(db, restaurant_id, "Petrova Anna", "Ivan Petrov", "petr Sidorov")
+
+    assert await search(db, restaurant_id, "Petr", limit=2) == ["petr Sidorov", "Petrova Anna"]
+
+
+async def test_substring_matches_when_prefix_does_not_fill_the_page(db, restaurant_id):
+    await add_guests(db, restaurant_id, "Petrova Anna", "Ivan Petrov", "Anna Ivanova")
+
+    assert sorted(await search(db, restaurant_id, "Petr", limit=20)) == ["Ivan Petrov", "Petrova Anna"]
+    # Not a name (does not start with a letter): phones are searched too.
+    assert await search(db, restaurant_id, "0000001", limit=20) == ["Ivan Petrov"]
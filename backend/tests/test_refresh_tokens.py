@@ -0,0 +1,89 @@
+"""Refresh token store: rotation, reuse detection, logout, logout everywhere."""
+from uuid import uuid4
+
+import pytest
+
+from app.core.security import decode_token
+from app.services.refresh_tokens import refresh_tokens
+
+
+@pytest.fixture
+def user_id():
+    return uuid4()
+
+
+async def use(token: str):
+    return await refresh_tokens.consume(decode_token(token))
+
+
+async def test_fresh_token_is_accepted(redis, user_id):
+    token = await refresh_tokens.issue(user_id)
+    consumed = await use(token)
+    assert consumed == (user_id, decode_token(token)["fam"])
+
+
+async def test_rotation_keeps_family_and_rejects_the_old_token(redis, user_id):
+    first = await refresh_tokens.issue(user_id)
+    _, family = await use(first)
+    second = await refresh_tokens.issue(user_id, family)
+    assert decode_token(second)["fam"] == family
+    assert await use(first) is None
+
+
+async def test_consumed_token_is_marked_used_atomically(redis, user_id):
+    token = await refresh_tokens.issue(user_id)
+    jti = decode_token(token)["jti"]
+    await use(token)
+    assert await redis.exists(f"auth:rt:{jti}") == 0
+    assert await redis.get(f"auth:rt_used:{jti}") == decode_token(token)["fam"]
+    assert await redis.ttl(f"auth:rt_used:{jti}") > 0
+
+
+async def test_reuse_revokes_the_whole_family(redis, user_id):
+    first = await refresh_tokens.issue(user_id)
+    _, family = await use(first)
+    second = await refresh_tokens.issue(user_id, family)
+    assert await use(first) is None  # replayed by whoever copied it
+    assert await redis.exists(f"auth:rt_revoked:{family}") == 1
+    assert await use(second) is None  # the legitimate holder's current token dies too
+
+
+async def test_reuse_does_not_touch_other_families(redis, user_id):
+    stolen = await refresh_tokens.issue(user_id)
+    other = await refresh_tokens.issue(user_id)
+    await use(stolen)
+    await use(stolen)
+    assert await use(other) is not None
+
+
+async def test_logout_revokes_the_session(redis, user_id):
+    token = await refresh_tokens.issue(user_id)
+    await refresh_tokens.revoke_family(decode_token(token)["fam"])
+    assert await use(token) is None
+
+
+async def test_logout_everywhere_revokes_all_sessions(redis, user_id):
+    a = await refresh_tokens.issue(user_id)
+    b = await refresh_tokens.issue(user_id)
+    await refresh_tokens.revoke_user(user_id)
+    assert await use(a) is None
+    assert await use(b) is None
+    assert await use(await refresh_tokens.issue(user_id)) is not None
+
+
+async def test_logout_everywhere_is_per_user(redis, user_id):
+    other = await refresh_tokens.issue(uuid4())
+    await refresh_tokens.revoke_user(user_id)
+    assert await use(other) is not None
+
+
+async def test_token_without_jti_is_rejected(redis, user_id):
+    payload = decode_token(await refresh_tokens.issue(user_id))
+    del payload["jti"]
+    assert await refresh_tokens.consume(payload) is None
+
+
+async def test_token_with_foreign_family_is_rejected(redis, user_id):
+    payload = decode_token(await refresh_tokens.issue(user_id))
+    payload["fam"] = uuid4().hex
+    assert await refresh_tokens.consume(payload) is None